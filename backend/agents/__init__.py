@@ -4,16 +4,39 @@ Multi-Agent AI System for Rural Education
 Contains 8 specialized agents coordinated by an orchestrator
 """
 
+import importlib
+
 from .base_agent import (
-    BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin
+    BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin,
+    QueryContext, KeywordAutomaton
 )
-from .offline_knowledge_agent import OfflineKnowledgeAgent
-from .study_assistant_agent import StudyAssistantAgent
-from .voice_language_agents import VoiceInterfaceAgent, LanguageSupportAgent
-from .assessment_content_agents import AssessmentAgent, ContentDiscoveryAgent
-from .study_path_accessibility_agents import StudyPathPlannerAgent, AccessibilityAgent
-from .offline_photomath_agent import OfflinePhotoMathAgent
-from .orchestrator import AgentOrchestrator, get_orchestrator
+
+_LAZY_IMPORTS = {
+    'OfflineKnowledgeAgent': '.offline_knowledge_agent',
+    'StudyAssistantAgent': '.study_assistant_agent',
+    'VoiceInterfaceAgent': '.voice_language_agents',
+    'LanguageSupportAgent': '.voice_language_agents',
+    'AssessmentAgent': '.assessment_content_agents',
+    'ContentDiscoveryAgent': '.assessment_content_agents',
+    'StudyPathPlannerAgent': '.study_path_accessibility_agents',
+    'AccessibilityAgent': '.study_path_accessibility_agents',
+    'OfflinePhotoMathAgent': '.offline_photomath_agent',
+    'AgentOrchestrator': '.orchestrator',
+    'get_orchestrator': '.orchestrator',
+}
+
+def __getattr__(name):
+    """Import agent modules on first access (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 __all__ = [
 
@@ -22,6 +45,8 @@ __all__ = [
     'AgentCapability',
     'AgentPriority',
     'ToolIntegrationMixin',
+    'QueryContext',
+    'KeywordAutomaton',
 
     'OfflineKnowledgeAgent',
     'StudyAssistantAgent',
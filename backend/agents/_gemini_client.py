@@ -0,0 +1,92 @@
+"""
+Shared Gemini client
+Configures google-generativeai once per API key, reuses model instances across agents
+and coalesces identical in-flight requests
+"""
+
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+DEFAULT_GEMINI_MODEL = 'gemini-2.0-flash-exp'
+
+# API key genai is currently configured with
+_configured_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+# (model, prompt) -> Future of the generate_content call currently running
+_in_flight: Dict[Tuple[object, str], Future] = {}
+_in_flight_lock = threading.Lock()
+
+def _ensure_gemini_configured(api_key: str) -> None:
+    """
+    Call genai.configure only when the API key changes
+
+    configure() drops the SDK's cached clients, and with them the open gRPC
+    channel, so repeating it would make the next call redo the TLS handshake.
+    """
+    global _configured_key
+
+    with _configure_lock:
+        if _configured_key == api_key:
+            return
+
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        _configured_key = api_key
+
+@functools.lru_cache(maxsize=8)
+def get_gemini_model(api_key: Optional[str] = None, model_name: str = DEFAULT_GEMINI_MODEL,
+                     system_instruction: Optional[str] = None):
+    """
+    Get a shared GenerativeModel
+
+    Agents holding the same instance also share its underlying gRPC channel,
+    so connection setup is paid once instead of once per agent.
+
+    Args:
+        api_key: Gemini API key (None uses the SDK's environment lookup)
+        model_name: Gemini model name
+        system_instruction: Fixed instructions sent ahead of every prompt
+
+    Returns:
+        google.generativeai.GenerativeModel
+    """
+    import google.generativeai as genai
+
+    if api_key:
+        _ensure_gemini_configured(api_key)
+
+    return genai.GenerativeModel(model_name, system_instruction=system_instruction)
+
+def generate_text(model, prompt: str) -> str:
+    """
+    model.generate_content(prompt).text, shared by concurrent identical calls
+
+    Bursts of the same prompt (a class asking the same homework question)
+    wait on the one request already in flight instead of each paying a
+    Gemini round trip.
+    """
+    key = (model, prompt)
+
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = _in_flight[key] = Future()
+
+    if not is_owner:
+        return future.result()
+
+    try:
+        text = model.generate_content(prompt).text
+        future.set_result(text)
+        return text
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
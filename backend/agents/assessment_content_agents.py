@@ -2,18 +2,145 @@
 Assessment & Content Discovery Agents - Agents #5 & #6
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TypedDict
+from collections import OrderedDict
+from types import MappingProxyType
+import asyncio
+import hashlib
+import json
+import operator
 import random
+import re
+import threading
+from ._gemini_client import get_gemini_model
 from .base_agent import (
     BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin
 )
 
+_ASSESSMENT_KEYWORDS = (
+    'quiz', 'test', 'question', 'practice', 'mcq',
+    'exam', 'assessment', 'evaluate', 'check answer'
+)
+
+_CONTENT_KEYWORDS = (
+    'video', 'youtube', 'watch', 'learn from',
+    'recommend', 'tutorial', 'lecture', 'explanation'
+)
+
+_ASSESSMENT_RE = re.compile('|'.join(map(re.escape, _ASSESSMENT_KEYWORDS)))
+_CONTENT_RE = re.compile('|'.join(map(re.escape, _CONTENT_KEYWORDS)))
+
+def _normalize_answer(answer) -> str:
+    """Normalize an answer for exact-match comparison"""
+    return str(answer).lower().strip()
+
+_QUIZ_TEMPLATES = MappingProxyType({
+    'Mathematics': MappingProxyType({
+        'easy': (
+            'What is 5 + 7?',
+            'Calculate the area of a square with side 4 cm',
+            'What is 3 × 8?',
+        ),
+        'medium': (
+            'Solve: 2x + 5 = 15',
+            'Find the perimeter of a rectangle with length 8 cm and width 5 cm',
+            'Calculate: (15 + 25) ÷ 4'
+        ),
+        'hard': (
+            'Solve the quadratic equation: x² - 5x + 6 = 0',
+            'Find the value of sin(30°)',
+            'Calculate the volume of a cylinder with radius 7 cm and height 10 cm'
+        )
+    }),
+    'Science': MappingProxyType({
+        'easy': (
+            'What is the chemical symbol for water?',
+            'Name the process by which plants make food',
+            'What is the unit of force?'
+        ),
+        'medium': (
+            'Explain Newton\'s first law of motion',
+            'What is photosynthesis? Write the equation',
+            'Describe the structure of an atom'
+        ),
+        'hard': (
+            'Explain the difference between concave and convex lenses',
+            'Describe the working of a human heart',
+            'Explain how electricity is generated in a thermal power plant'
+        )
+    })
+})
+
+# (subject, difficulty) -> question texts, for a single-lookup pool
+_FLAT_QUIZ_TEMPLATES = MappingProxyType({
+    (subject, difficulty): questions
+    for subject, by_difficulty in _QUIZ_TEMPLATES.items()
+    for difficulty, questions in by_difficulty.items()
+})
+
+_CACHED_CHANNELS = MappingProxyType({
+    'Mathematics': (
+        'Khan Academy',
+        'Vedantu',
+        'Unacademy',
+        'Physics Wallah'
+    ),
+    'Science': (
+        'Khan Academy',
+        'Crash Course',
+        'Vedantu',
+        'Byju\'s'
+    ),
+    'Social Science': (
+        'Unacademy',
+        'Study IQ',
+        'Khan Academy'
+    )
+})
+
+class QuizQuestion(TypedDict):
+    """Structured quiz question returned by Gemini"""
+    id: int
+    question: str
+    options: List[str]
+    correct_answer: str
+    type: str
+
+class AnswerEvaluation(TypedDict):
+    """Structured answer evaluation returned by Gemini"""
+    is_correct: bool
+    feedback: str
+    hint: str
+
+_QUIZ_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': list[QuizQuestion]
+}
+
+_EVALUATION_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': AnswerEvaluation
+}
+
+_QUIZ_INSTRUCTIONS = """You write practice questions for school students.
+MCQs have 4 options; leave options empty for other question types.
+Make questions educational and appropriate for students."""
+
+_AI_CACHE_SIZE = 512
+_AI_CACHE_HOURS = 24
+
 class AssessmentAgent(ToolIntegrationMixin, BaseAgent):
     """
     Agent #5 - Assessment Agent
     Generates quizzes, evaluates answers, provides feedback
     """
 
+    __slots__ = (
+        'knowledge_base', 'cache_manager', 'syllabus_parser',
+        'model', '_quiz_model', 'quiz_templates', '_ai_cache', '_ai_cache_lock',
+        '_flat_templates', '_available_subjects'
+    )
+
     def __init__(self, gemini_model=None):
         super().__init__(
             agent_id="assessment",
@@ -28,54 +155,19 @@ class AssessmentAgent(ToolIntegrationMixin, BaseAgent):
         )
 
         self.model = gemini_model
+        self._quiz_model = None
 
-        self.quiz_templates = {
-            'Mathematics': {
-                'easy': [
-                    'What is 5 + 7?',
-                    'Calculate the area of a square with side 4 cm',
-                    'What is 3 × 8?',
-                ],
-                'medium': [
-                    'Solve: 2x + 5 = 15',
-                    'Find the perimeter of a rectangle with length 8 cm and width 5 cm',
-                    'Calculate: (15 + 25) ÷ 4'
-                ],
-                'hard': [
-                    'Solve the quadratic equation: x² - 5x + 6 = 0',
-                    'Find the value of sin(30°)',
-                    'Calculate the volume of a cylinder with radius 7 cm and height 10 cm'
-                ]
-            },
-            'Science': {
-                'easy': [
-                    'What is the chemical symbol for water?',
-                    'Name the process by which plants make food',
-                    'What is the unit of force?'
-                ],
-                'medium': [
-                    'Explain Newton\'s first law of motion',
-                    'What is photosynthesis? Write the equation',
-                    'Describe the structure of an atom'
-                ],
-                'hard': [
-                    'Explain the difference between concave and convex lenses',
-                    'Describe the working of a human heart',
-                    'Explain how electricity is generated in a thermal power plant'
-                ]
-            }
-        }
+        # Reached from the orchestrator's enhancement pool and to_thread callers
+        self._ai_cache: OrderedDict = OrderedDict()
+        self._ai_cache_lock = threading.Lock()
+
+        self.quiz_templates = _QUIZ_TEMPLATES
+        self._flat_templates = _FLAT_QUIZ_TEMPLATES
+        self._available_subjects = tuple(_QUIZ_TEMPLATES.keys())
 
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
-        query_lower = query.lower()
-
-        assessment_keywords = [
-            'quiz', 'test', 'question', 'practice', 'mcq',
-            'exam', 'assessment', 'evaluate', 'check answer'
-        ]
-
-        if any(kw in query_lower for kw in assessment_keywords):
+        if _ASSESSMENT_RE.search(self._lower_query(query, context)):
             return 0.9
 
         return 0.2
@@ -90,6 +182,8 @@ class AssessmentAgent(ToolIntegrationMixin, BaseAgent):
             return self._generate_offline_quiz(context)
         elif operation == 'evaluate_answer':
             return self._evaluate_answer_basic(context)
+        elif operation == 'evaluate_answers':
+            return self._evaluate_answers_batch(context)
         else:
             return {
                 'success': False,
@@ -115,33 +209,31 @@ class AssessmentAgent(ToolIntegrationMixin, BaseAgent):
         difficulty = context.get('difficulty', 'medium')
         count = context.get('count', 5)
 
-        if subject not in self.quiz_templates:
-            available = list(self.quiz_templates.keys())
-            return {
-                'success': False,
-                'error': f'Subject {subject} not available offline',
-                'available_subjects': available
-            }
+        pool = self._flat_templates.get((subject, difficulty))
+
+        if pool is None:
+            if subject not in self.quiz_templates:
+                return {
+                    'success': False,
+                    'error': f'Subject {subject} not available offline',
+                    'available_subjects': list(self._available_subjects)
+                }
 
-        if difficulty not in self.quiz_templates[subject]:
             difficulty = 'medium'
+            pool = self._flat_templates[(subject, difficulty)]
 
-        questions = self.quiz_templates[subject][difficulty]
-        selected = random.sample(questions, min(count, len(questions)))
+        # Fresh dicts per response, so callers may annotate them freely
+        selected = [
+            {'id': i, 'question': question, 'type': 'short_answer'}
+            for i, question in enumerate(random.sample(pool, min(count, len(pool))), 1)
+        ]
 
         return {
             'success': True,
             'subject': subject,
             'difficulty': difficulty,
             'question_count': len(selected),
-            'questions': [
-                {
-                    'id': i + 1,
-                    'question': q,
-                    'type': 'short_answer'
-                }
-                for i, q in enumerate(selected)
-            ],
+            'questions': selected,
             'mode': 'offline',
             'note': 'Questions from pre-loaded bank. Connect to internet for custom AI-generated quizzes.'
         }
@@ -151,41 +243,142 @@ class AssessmentAgent(ToolIntegrationMixin, BaseAgent):
         if not self.model:
             return self.process_offline(query, context)
 
-        subject = context.get('subject', 'General')
-        topic = context.get('topic', query)
-        difficulty = context.get('difficulty', 'medium')
-        count = context.get('count', 5)
-        question_type = context.get('question_type', 'mcq')
+        params = self._quiz_params(query, context)
+        key = self._ai_cache_key(*params)
+        questions = self._get_ai_cached_json('ai_quiz', key)
+
+        if questions is not None:
+            return self._ai_quiz_response(params, questions, cached=True)
 
         try:
-            prompt = f"""Generate {count} {question_type} questions on the topic: {topic}
-Subject: {subject}
-Difficulty: {difficulty}
+            model, prompt = self._quiz_request(params)
+            response = model.generate_content(
+                prompt,
+                generation_config=_QUIZ_GENERATION_CONFIG
+            )
+            questions = json.loads(response.text)
+            self._set_ai_cached('ai_quiz', key, response.text)
 
-Format:
-For MCQ: Question, 4 options (A, B, C, D), correct answer
-For Short Answer: Question only
+            return self._ai_quiz_response(params, questions)
 
-Make questions educational and appropriate for students."""
+        except Exception as e:
+            self.logger.error(f"AI quiz generation failed: {e}")
+            return self.process_offline(query, context)
+
+    async def _generate_ai_quiz_async(self, query: str, context: Dict) -> Dict:
+        """Generate quiz using Gemini AI without blocking the event loop"""
+        if not self.model:
+            return self.process_offline(query, context)
 
-            response = self.model.generate_content(prompt)
+        params = self._quiz_params(query, context)
+        key = self._ai_cache_key(*params)
+        questions = self._get_ai_cached_json('ai_quiz', key)
 
-            return {
-                'success': True,
-                'subject': subject,
-                'topic': topic,
-                'difficulty': difficulty,
-                'question_count': count,
-                'questions_text': response.text,
-                'mode': 'online',
-                'source': 'ai_generated',
-                'note': 'AI-generated questions for practice'
-            }
+        if questions is not None:
+            return self._ai_quiz_response(params, questions, cached=True)
+
+        try:
+            model, prompt = self._quiz_request(params)
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=_QUIZ_GENERATION_CONFIG
+            )
+            questions = json.loads(response.text)
+            self._set_ai_cached('ai_quiz', key, response.text)
+
+            return self._ai_quiz_response(params, questions)
 
         except Exception as e:
             self.logger.error(f"AI quiz generation failed: {e}")
             return self.process_offline(query, context)
 
+    async def generate_quizzes_batch(self, requests: List[Dict],
+                                     max_concurrency: int = 8) -> List[Dict]:
+        """
+        Generate several quizzes concurrently
+
+        Args:
+            requests: Quiz contexts (subject, topic, difficulty, count, question_type)
+            max_concurrency: Upper bound on in-flight Gemini calls
+
+        Returns:
+            Quiz responses in the same order as requests
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate_one(context: Dict) -> Dict:
+            async with semaphore:
+                return await self._generate_ai_quiz_async(
+                    context.get('topic', ''), dict(context)
+                )
+
+        return list(await asyncio.gather(*(generate_one(r) for r in requests)))
+
+    @staticmethod
+    def _quiz_params(query: str, context: Dict) -> tuple:
+        """(subject, topic, difficulty, count, question_type) for a quiz request"""
+        return (
+            context.get('subject', 'General'),
+            context.get('topic', query),
+            context.get('difficulty', 'medium'),
+            context.get('count', 5),
+            context.get('question_type', 'mcq')
+        )
+
+    @staticmethod
+    def _build_quiz_prompt(subject: str, topic: str, difficulty: str,
+                           count: int, question_type: str) -> str:
+        """Build the Gemini prompt for quiz generation"""
+        return f"""Generate {count} {question_type} questions on the topic: {topic}
+Subject: {subject}
+Difficulty: {difficulty}"""
+
+    def _quiz_request(self, params: tuple) -> tuple:
+        """
+        (model, prompt) for a quiz request
+
+        The fixed instructions live in the shared quiz model's system
+        instruction, so each call only sends the per-request tail and the
+        common prefix stays identical across calls. Models that cannot be
+        rebuilt with a system instruction get the instructions inline.
+        """
+        if self._quiz_model is None:
+            try:
+                self._quiz_model = get_gemini_model(
+                    model_name=self.model.model_name,
+                    system_instruction=_QUIZ_INSTRUCTIONS
+                )
+            except Exception as e:
+                self.logger.warning(f"Quiz model setup failed, using inline instructions: {e}")
+                self._quiz_model = False
+
+        if self._quiz_model:
+            return self._quiz_model, self._build_quiz_prompt(*params)
+
+        return self.model, f"{_QUIZ_INSTRUCTIONS}\n\n{self._build_quiz_prompt(*params)}"
+
+    @staticmethod
+    def _ai_quiz_response(params: tuple, questions: List[Dict], cached: bool = False) -> Dict:
+        """Build the response dict for an AI-generated quiz"""
+        subject, topic, difficulty, _, _ = params
+
+        response = {
+            'success': True,
+            'subject': subject,
+            'topic': topic,
+            'difficulty': difficulty,
+            'question_count': len(questions),
+            'questions': questions,
+            'mode': 'online',
+            'source': 'ai_generated',
+            'note': 'AI-generated questions for practice'
+        }
+
+        if cached:
+            response['cached'] = True
+
+        return response
+
     def _evaluate_answer_basic(self, context: Dict) -> Dict:
         """Basic answer evaluation (offline)"""
         question = context.get('question', '')
@@ -210,6 +403,37 @@ Make questions educational and appropriate for students."""
             'evaluation_method': 'exact_match'
         }
 
+    def _evaluate_answers_batch(self, context: Dict) -> Dict:
+        """
+        Exact-match grading for many (answer, correct_answer) pairs (offline)
+
+        Used for bulk grading, e.g. a whole class worksheet, where a per-answer
+        round trip through process() is wasted overhead.
+        """
+        pairs = context.get('answers') or []
+
+        if not pairs:
+            return {
+                'success': False,
+                'error': 'answers must be a list of [answer, correct_answer] pairs'
+            }
+
+        answers, correct_answers = zip(*pairs)
+        results = list(map(
+            operator.eq,
+            map(_normalize_answer, answers),
+            map(_normalize_answer, correct_answers)
+        ))
+
+        return {
+            'success': True,
+            'results': results,
+            'correct_count': sum(results),
+            'total': len(results),
+            'mode': 'offline',
+            'evaluation_method': 'exact_match'
+        }
+
     def _evaluate_answer_ai(self, context: Dict) -> Dict:
         """AI-powered answer evaluation (online)"""
         if not self.model:
@@ -218,24 +442,41 @@ Make questions educational and appropriate for students."""
         question = context.get('question', '')
         answer = context.get('answer', '')
 
+        key = self._ai_cache_key(
+            ' '.join(question.lower().split()),
+            ' '.join(answer.lower().split())
+        )
+        evaluation = self._get_ai_cached_json('ai_evaluation', key)
+
+        if evaluation is not None:
+            return {
+                'success': True,
+                **evaluation,
+                'mode': 'online',
+                'source': 'ai_evaluation',
+                'cached': True
+            }
+
         try:
             prompt = f"""Evaluate this student answer:
 
 Question: {question}
 Student Answer: {answer}
 
-Provide:
-1. Is the answer correct? (Yes/No)
-2. Brief feedback (encouraging if correct, helpful if incorrect)
-3. If incorrect, give a hint without revealing the full answer
+Give brief feedback (encouraging if correct, helpful if incorrect).
+If incorrect, give a hint without revealing the full answer, otherwise leave hint empty.
+Keep it concise and student-friendly."""
 
-Keep response concise and student-friendly."""
-
-            response = self.model.generate_content(prompt)
+            response = self.model.generate_content(
+                prompt,
+                generation_config=_EVALUATION_GENERATION_CONFIG
+            )
+            evaluation = json.loads(response.text)
+            self._set_ai_cached('ai_evaluation', key, response.text)
 
             return {
                 'success': True,
-                'evaluation': response.text,
+                **evaluation,
                 'mode': 'online',
                 'source': 'ai_evaluation'
             }
@@ -244,12 +485,82 @@ Keep response concise and student-friendly."""
             self.logger.error(f"AI evaluation failed: {e}")
             return self._evaluate_answer_basic(context)
 
+    @staticmethod
+    def _ai_cache_key(*parts) -> str:
+        """Build a compact cache key from the request parameters"""
+        raw = '|'.join(str(p) for p in parts)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _get_ai_cached(self, content_type: str, key: str) -> Optional[str]:
+        """Look up a generated response in memory, then in the cache manager"""
+        mem_key = (content_type, key)
+        with self._ai_cache_lock:
+            text = self._ai_cache.get(mem_key)
+            if text is not None:
+                self._ai_cache.move_to_end(mem_key)
+                return text
+
+        if self.cache_manager:
+            try:
+                cached = self.cache_manager.get_cached_content(content_type, key)
+            except Exception as e:
+                self.logger.warning(f"AI cache lookup failed: {e}")
+                cached = None
+
+            if cached:
+                text = cached.get('parsed_data', {}).get('text')
+                if text is not None:
+                    self._remember_ai_response(mem_key, text)
+                    return text
+
+        return None
+
+    def _get_ai_cached_json(self, content_type: str, key: str):
+        """Cached structured response, or None on a miss or unreadable entry"""
+        text = self._get_ai_cached(content_type, key)
+        if text is None:
+            return None
+
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def _set_ai_cached(self, content_type: str, key: str, text: str):
+        """Store a generated response in both cache tiers"""
+        self._remember_ai_response((content_type, key), text)
+
+        if self.cache_manager:
+            try:
+                self.cache_manager.save_downloaded_content(
+                    content_type=content_type,
+                    content_id=key,
+                    data={'text': text},
+                    expires_hours=_AI_CACHE_HOURS
+                )
+            except Exception as e:
+                self.logger.warning(f"AI cache store failed: {e}")
+
+    def _remember_ai_response(self, mem_key, text: str):
+        """Insert into the in-process LRU, evicting the oldest entry when full"""
+        with self._ai_cache_lock:
+            self._ai_cache[mem_key] = text
+            self._ai_cache.move_to_end(mem_key)
+
+            if len(self._ai_cache) > _AI_CACHE_SIZE:
+                self._ai_cache.popitem(last=False)
+
 class ContentDiscoveryAgent(ToolIntegrationMixin, BaseAgent):
     """
     Agent #6 - Content Discovery Agent
     Recommends YouTube videos and educational content
     """
 
+    __slots__ = (
+        'knowledge_base', 'cache_manager', 'syllabus_parser',
+        'youtube_api_key', 'cached_channels'
+    )
+
     def __init__(self, youtube_api_key: str = None):
         super().__init__(
             agent_id="content_discovery",
@@ -265,36 +576,11 @@ class ContentDiscoveryAgent(ToolIntegrationMixin, BaseAgent):
 
         self.youtube_api_key = youtube_api_key
 
-        self.cached_channels = {
-            'Mathematics': [
-                'Khan Academy',
-                'Vedantu',
-                'Unacademy',
-                'Physics Wallah'
-            ],
-            'Science': [
-                'Khan Academy',
-                'Crash Course',
-                'Vedantu',
-                'Byju\'s'
-            ],
-            'Social Science': [
-                'Unacademy',
-                'Study IQ',
-                'Khan Academy'
-            ]
-        }
+        self.cached_channels = _CACHED_CHANNELS
 
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
-        query_lower = query.lower()
-
-        content_keywords = [
-            'video', 'youtube', 'watch', 'learn from',
-            'recommend', 'tutorial', 'lecture', 'explanation'
-        ]
-
-        if any(kw in query_lower for kw in content_keywords):
+        if _CONTENT_RE.search(self._lower_query(query, context)):
             return 0.85
 
         return 0.3
@@ -304,7 +590,7 @@ class ContentDiscoveryAgent(ToolIntegrationMixin, BaseAgent):
         context = context or {}
         subject = context.get('subject', 'Mathematics')
 
-        channels = self.cached_channels.get(subject, self.cached_channels['Mathematics'])
+        channels = list(self.cached_channels.get(subject, self.cached_channels['Mathematics']))
 
         cached_videos = []
         if self.cache_manager:
@@ -4,18 +4,25 @@ Provides abstract base class for all AI agents with dual-mode support (offline/o
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
-from enum import Enum
+from typing import Dict, List, Mapping, Optional, Any, Sequence
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
 import logging
+import re
+import time
 from datetime import datetime
 
-class AgentMode(Enum):
+QUERY_CONTEXT_KEY = '_query_ctx'
+
+_AGENT_LOGGER = logging.getLogger("Agent")
+
+class AgentMode(str, Enum):
     """Agent operation modes"""
     OFFLINE = "offline"
     ONLINE = "online"
     AUTO = "auto"
 
-class AgentCapability(Enum):
+class AgentCapability(str, Enum):
     """Agent capabilities"""
     TEXT_PROCESSING = "text_processing"
     VOICE_PROCESSING = "voice_processing"
@@ -27,19 +34,92 @@ class AgentCapability(Enum):
     TRANSLATION = "translation"
     ACCESSIBILITY = "accessibility"
 
-class AgentPriority(Enum):
+class AgentPriority(IntEnum):
     """Agent priority levels for orchestration"""
     CRITICAL = 1
     HIGH = 2
     MEDIUM = 3
     LOW = 4
 
+_OFFLINE = AgentMode.OFFLINE
+_ONLINE = AgentMode.ONLINE
+_AUTO = AgentMode.AUTO
+
+@dataclass
+class QueryContext:
+    """Per-request query data shared by every agent during routing"""
+    raw: str
+    lower: str
+    tokens: frozenset = frozenset()
+    scores: Dict[str, float] = field(default_factory=dict)
+    kb_results: Dict[tuple, tuple] = field(default_factory=dict)
+    keyword_hits: Dict[str, frozenset] = field(default_factory=dict)
+
+    @classmethod
+    def from_query(cls, query: str) -> 'QueryContext':
+        """Normalize and tokenize the query once for the whole request"""
+        lower = query.lower()
+        return cls(raw=query, lower=lower, tokens=frozenset(lower.split()))
+
+class KeywordAutomaton:
+    """
+    One regex scan of the query for several agents' keyword lists
+
+    Each keyword list gets a tag; hits() returns the tags whose keywords
+    occur in the query (plain substring semantics), scanning at most once
+    per request however many agents ask.
+    """
+
+    __slots__ = ('name', '_regex', '_keyword_tags')
+
+    def __init__(self, name: str, keywords_by_tag: Mapping[str, Sequence[str]]):
+        self.name = name
+
+        tags = {}
+        for tag, keywords in keywords_by_tag.items():
+            for kw in keywords:
+                tags.setdefault(kw, set()).add(tag)
+
+        # The scan reports the longest keyword at each position, so a keyword
+        # also carries the tags of any shorter keyword it starts with
+        self._keyword_tags = {
+            kw: frozenset().union(*(tags[other] for other in tags if kw.startswith(other)))
+            for kw in tags
+        }
+        self._regex = re.compile(
+            '(?=({}))'.format('|'.join(map(re.escape, sorted(self._keyword_tags, key=len, reverse=True))))
+        )
+
+    def hits(self, query: str, context: Dict = None) -> frozenset:
+        """Tags matched by the query, memoized on the request's QueryContext"""
+        query_ctx = context.get(QUERY_CONTEXT_KEY) if context else None
+        if query_ctx is not None and query_ctx.raw == query:
+            found = query_ctx.keyword_hits.get(self.name)
+            if found is None:
+                found = query_ctx.keyword_hits[self.name] = self._scan(query_ctx.lower)
+            return found
+
+        return self._scan(query.lower())
+
+    def _scan(self, query_lower: str) -> frozenset:
+        return frozenset().union(
+            *(self._keyword_tags[match.group(1)] for match in self._regex.finditer(query_lower))
+        )
+
 class BaseAgent(ABC):
     """
     Abstract base class for all AI agents
     Provides common functionality for offline/online operation
     """
 
+    __slots__ = (
+        'agent_id', 'name', 'description', 'capabilities', 'priority',
+        'default_mode', 'current_mode', 'logger',
+        '_current_mode_value', '_pinned_mode', '_capabilities_values',
+        '_n_total', '_n_offline', '_n_online', '_n_ok', '_n_err',
+        '_avg_ms', '_last_used'
+    )
+
     def __init__(self,
                  agent_id: str,
                  name: str,
@@ -65,22 +145,33 @@ class BaseAgent(ABC):
         self.priority = priority
         self.default_mode = default_mode
         self.current_mode = default_mode
-        self.logger = logging.getLogger(f"Agent.{agent_id}")
-
-        self.stats = {
-            'total_requests': 0,
-            'offline_requests': 0,
-            'online_requests': 0,
-            'successful_responses': 0,
-            'failed_responses': 0,
-            'avg_response_time_ms': 0,
-            'last_used': None
-        }
+        self._current_mode_value = default_mode.value
+        self._pinned_mode = self._pin(default_mode)
+        self._capabilities_values = tuple(cap.value for cap in capabilities)
+        self.logger = _AGENT_LOGGER.getChild(agent_id)
+
+        self.reset_stats()
 
     def set_mode(self, mode: AgentMode):
         """Set agent operation mode"""
         self.current_mode = mode
-        self.logger.info(f"Agent {self.name} switched to {mode.value} mode")
+        self._current_mode_value = mode.value
+        self._pinned_mode = self._pin(mode)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Agent {self.name} switched to {mode.value} mode")
+
+    @staticmethod
+    def _pin(mode: AgentMode) -> Optional[tuple]:
+        """
+        Pre-resolved (mode, value) for a fixed mode, None for AUTO
+
+        Lets process() skip mode resolution entirely for agents pinned
+        to offline or online operation.
+        """
+        if mode is _AUTO:
+            return None
+
+        return (mode, mode.value)
 
     def can_handle(self, query: str, context: Dict = None) -> float:
         """
@@ -96,6 +187,42 @@ class BaseAgent(ABC):
 
         return 0.0
 
+    def score(self, query: str, context: Dict = None) -> float:
+        """
+        can_handle memoized on the request's QueryContext
+
+        Each agent is scored at most once per orchestrator request; without
+        a QueryContext this is a plain can_handle call.
+        """
+        query_ctx = context.get(QUERY_CONTEXT_KEY) if context else None
+        if query_ctx is None:
+            return self.can_handle(query, context)
+
+        confidence = query_ctx.scores.get(self.agent_id)
+        if confidence is None:
+            confidence = self.can_handle(query, context)
+            query_ctx.scores[self.agent_id] = confidence
+
+        return confidence
+
+    @staticmethod
+    def _lower_query(query: str, context: Dict = None) -> str:
+        """Lowercased query, reusing the orchestrator's copy when present"""
+        query_ctx = context.get(QUERY_CONTEXT_KEY) if context else None
+        if query_ctx is not None and query_ctx.raw == query:
+            return query_ctx.lower
+
+        return query.lower()
+
+    @staticmethod
+    def _query_tokens(query: str, context: Dict = None) -> frozenset:
+        """Whitespace tokens of the lowercased query, shared like _lower_query"""
+        query_ctx = context.get(QUERY_CONTEXT_KEY) if context else None
+        if query_ctx is not None and query_ctx.raw == query:
+            return query_ctx.tokens
+
+        return frozenset(query.lower().split())
+
     @abstractmethod
     def process_offline(self, query: str, context: Dict = None) -> Dict:
         """
@@ -136,49 +263,59 @@ class BaseAgent(ABC):
         Returns:
             Response dictionary
         """
-        start_time = datetime.now()
-
-        self.stats['total_requests'] += 1
-        self.stats['last_used'] = start_time.isoformat()
+        start_ns = time.perf_counter_ns()
+        self._n_total += 1
+        self._last_used = datetime.now().isoformat()
 
-        active_mode = mode if mode else self.current_mode
+        if mode is None and self._pinned_mode is not None:
+            active_mode, mode_value = self._pinned_mode
+        else:
+            active_mode = mode or self.current_mode
 
-        if active_mode == AgentMode.AUTO:
-            has_internet = self._check_connectivity(context)
-            active_mode = AgentMode.ONLINE if has_internet else AgentMode.OFFLINE
+            if active_mode is _AUTO:
+                active_mode = _ONLINE if self._check_connectivity(context) else _OFFLINE
 
-        try:
+            mode_value = (
+                self._current_mode_value if active_mode is self.current_mode
+                else active_mode.value
+            )
 
-            if active_mode == AgentMode.OFFLINE:
-                self.stats['offline_requests'] += 1
-                response = self.process_offline(query, context)
-            else:
-                self.stats['online_requests'] += 1
-                response = self.process_online(query, context)
+        if active_mode is _OFFLINE:
+            handler = self.process_offline
+            self._n_offline += 1
+        else:
+            handler = self.process_online
+            self._n_online += 1
 
-            response['agent_id'] = self.agent_id
-            response['agent_name'] = self.name
-            response['mode'] = active_mode.value
-            response['timestamp'] = datetime.now().isoformat()
+        try:
+            response = handler(query, context)
 
-            self.stats['successful_responses'] += 1
+            self._n_ok += 1
 
-            elapsed = (datetime.now() - start_time).total_seconds() * 1000
+            elapsed = (time.perf_counter_ns() - start_ns) / 1_000_000
             self._update_avg_response_time(elapsed)
-            response['response_time_ms'] = round(elapsed, 2)
+
+            response.update(
+                agent_id=self.agent_id,
+                agent_name=self.name,
+                mode=mode_value,
+                timestamp=datetime.now().isoformat(),
+                response_time_ms=round(elapsed, 2)
+            )
 
             return response
 
         except Exception as e:
-            self.stats['failed_responses'] += 1
-            self.logger.error(f"Agent {self.name} processing error: {e}")
+            self._n_err += 1
+            if self.logger.isEnabledFor(logging.ERROR):
+                self.logger.error(f"Agent {self.name} processing error: {e}")
 
             return {
                 'success': False,
                 'error': str(e),
                 'agent_id': self.agent_id,
                 'agent_name': self.name,
-                'mode': active_mode.value,
+                'mode': mode_value,
                 'timestamp': datetime.now().isoformat()
             }
 
@@ -198,17 +335,8 @@ class BaseAgent(ABC):
         return False
 
     def _update_avg_response_time(self, new_time_ms: float):
-        """Update average response time"""
-        current_avg = self.stats['avg_response_time_ms']
-        total = self.stats['successful_responses']
-
-        if total == 1:
-            self.stats['avg_response_time_ms'] = new_time_ms
-        else:
-
-            self.stats['avg_response_time_ms'] = (
-                (current_avg * (total - 1) + new_time_ms) / total
-            )
+        """Update average response time (incremental mean)"""
+        self._avg_ms += (new_time_ms - self._avg_ms) / self._n_ok
 
     def get_info(self) -> Dict:
         """Get agent information"""
@@ -216,26 +344,45 @@ class BaseAgent(ABC):
             'agent_id': self.agent_id,
             'name': self.name,
             'description': self.description,
-            'capabilities': [cap.value for cap in self.capabilities],
+            'capabilities': list(self._capabilities_values),
             'priority': self.priority.value,
-            'current_mode': self.current_mode.value,
+            'current_mode': self._current_mode_value,
             'stats': self.stats
         }
 
+    @property
+    def stats(self) -> Dict:
+        """Agent statistics (built on read from the per-request counters)"""
+        return {
+            'total_requests': self._n_total,
+            'offline_requests': self._n_offline,
+            'online_requests': self._n_online,
+            'successful_responses': self._n_ok,
+            'failed_responses': self._n_err,
+            'avg_response_time_ms': self._avg_ms,
+            'last_used': self._last_used
+        }
+
     def reset_stats(self):
         """Reset agent statistics"""
-        self.stats = {
-            'total_requests': 0,
-            'offline_requests': 0,
-            'online_requests': 0,
-            'successful_responses': 0,
-            'failed_responses': 0,
-            'avg_response_time_ms': 0,
-            'last_used': None
-        }
+        self._n_total = 0
+        self._n_offline = 0
+        self._n_online = 0
+        self._n_ok = 0
+        self._n_err = 0
+        self._avg_ms = 0
+        self._last_used = None
 
 class ToolIntegrationMixin:
-    """Mixin for agents that use custom tools"""
+    """
+    Mixin for agents that use custom tools
+
+    Declares no slots of its own (it is combined with BaseAgent, so a second
+    non-empty layout would conflict); slotted subclasses list
+    'knowledge_base', 'cache_manager' and 'syllabus_parser' themselves.
+    """
+
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -249,6 +396,28 @@ class ToolIntegrationMixin:
         self.cache_manager = cache
         self.syllabus_parser = parser
 
+    def _search_knowledge(self, query: str, context: Dict = None, limit: int = 3, **filters) -> List[Dict]:
+        """
+        knowledge_base.search shared by every agent within one request
+
+        Results are kept on the request's QueryContext, keyed by the filters
+        that actually apply (None filters are ignored by search). Search
+        returns the top matches in order, so a cached result with a larger
+        limit also answers a smaller one.
+        """
+        query_ctx = context.get(QUERY_CONTEXT_KEY) if context else None
+        if query_ctx is None or query_ctx.raw != query:
+            return self.knowledge_base.search(query=query, limit=limit, **filters)
+
+        key = tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+        cached = query_ctx.kb_results.get(key)
+        if cached is not None and cached[0] >= limit:
+            return cached[1][:limit]
+
+        results = self.knowledge_base.search(query=query, limit=limit, **filters)
+        query_ctx.kb_results[key] = (limit, results)
+        return results
+
     def has_tool_access(self) -> bool:
         """Check if tools are available"""
         return any([
@@ -4,52 +4,102 @@ Provides cached responses from offline knowledge base
 Critical priority - must work without internet
 """
 
+import functools
+import heapq
+import re
+from operator import itemgetter
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from .base_agent import (
     BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin
 )
 
+# Keywords are ordered by how often they hit in app-help queries, most
+# frequent first, so the alternation below settles on common words early
+_APP_KEYWORDS = (
+    'app', 'help', 'how to use', 'notes', 'offline',
+    'scan', 'share', 'settings', 'timetable', 'qr',
+    'feature', 'guide', 'navigation'
+)
+
+_EDUCATION_KEYWORDS = (
+    'what is', 'explain', 'formula', 'definition',
+    'law', 'theorem', 'concept', 'principle'
+)
+
+# One automaton for both keyword sets. The zero-width lookahead tries every
+# start position, so overlapping hits keep plain substring semantics and the
+# group name tells which set matched.
+_KEYWORD_RE = re.compile(
+    '(?=(?:(?P<app>{})|(?P<edu>{})))'.format(
+        '|'.join(map(re.escape, _APP_KEYWORDS)),
+        '|'.join(map(re.escape, _EDUCATION_KEYWORDS))
+    )
+)
+
+_INTERNET_MSGS = MappingProxyType({
+    'en': '🌐 Internet connection required for educational questions. I can only help with app usage questions in offline mode.',
+    'hi': '🌐 शैक्षिक प्रश्नों के लिए इंटरनेट कनेक्शन आवश्यक है। ऑफ़लाइन मोड में मैं केवल ऐप उपयोग प्रश्नों में मदद कर सकता हूं।',
+    'pa': '🌐 ਵਿਦਿਅਕ ਸਵਾਲਾਂ ਲਈ ਇੰਟਰਨੈੱਟ ਕਨੈਕਸ਼ਨ ਲੋੜੀਂਦਾ ਹੈ। ਔਫਲਾਈਨ ਮੋਡ ਵਿੱਚ ਮੈਂ ਸਿਰਫ਼ ਐਪ ਵਰਤੋਂ ਸਵਾਲਾਂ ਵਿੱਚ ਮਦਦ ਕਰ ਸਕਦਾ ਹਾਂ।',
+    'bn': '🌐 শিক্ষামূলক প্রশ্নের জন্য ইন্টারনেট সংযোগ প্রয়োজন। অফলাইন মোডে আমি শুধুমাত্র অ্যাপ ব্যবহারের প্রশ্নে সাহায্য করতে পারি।',
+    'ta': '🌐 கல்வி கேள்விகளுக்கு இணைய இணைப்பு தேவை. ஆஃப்லைன் பயன்முறையில் நான் ஆப் பயன்பாட்டு கேள்விகளில் மட்டுமே உதவ முடியும்.',
+    'te': '🌐 విద్యా ప్రశ్నలకు ఇంటర్నెట్ కనెక్షన్ అవసరం. ఆఫ్‌లైన్ మోడ్‌లో నేను యాప్ వినియోగ ప్రశ్నలలో మాత్రమే సహాయం చేయగలను।',
+    'mr': '🌐 शैक्षणिक प्रश्नांसाठी इंटरनेट कनेक्शन आवश्यक आहे. ऑफलाइन मोडमध्ये मी फक्त अॅप वापर प्रश्नांमध्ये मदत करू शकतो।',
+    'gu': '🌐 શૈક્ષણિક પ્રશ્નો માટે ઇન્ટરનેટ કનેક્શન જરૂરી છે. ઓફલાઇન મોડમાં હું ફક્ત એપ્લિકેશન ઉપયોગ પ્રશ્નોમાં મદદ કરી શકું છું।'
+})
+
+@functools.lru_cache(maxsize=4096)
+def _syllabus_tokens(topic: str, content: str) -> frozenset:
+    """Lowercased word set of a syllabus item, tokenized once per distinct item"""
+    return frozenset(f"{topic} {content}".lower().split())
+
 class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
     """
     Agent for offline knowledge retrieval
     Uses cached Q&A, app FAQs, and syllabus content
     """
 
+    __slots__ = ('knowledge_base', 'cache_manager', 'syllabus_parser')
+
+    app_keywords = _APP_KEYWORDS
+    education_keywords = _EDUCATION_KEYWORDS
+
+    # Whole-word view of the app keywords: a query token found here is a
+    # substring hit too, so it settles routing without the regex scan
+    APP_KW = frozenset(_APP_KEYWORDS)
+
+    _CAPABILITIES = (
+        AgentCapability.TEXT_PROCESSING,
+        AgentCapability.CONTENT_GENERATION
+    )
+
     def __init__(self):
         super().__init__(
             agent_id="offline_knowledge",
             name="Offline Knowledge Agent",
             description="Provides instant responses from cached knowledge base. Works completely offline.",
-            capabilities=[
-                AgentCapability.TEXT_PROCESSING,
-                AgentCapability.CONTENT_GENERATION
-            ],
+            capabilities=self._CAPABILITIES,
             priority=AgentPriority.CRITICAL,
             default_mode=AgentMode.OFFLINE
         )
 
-        self.app_keywords = [
-            'how to use', 'help', 'guide', 'app', 'feature',
-            'navigation', 'settings', 'scan', 'share', 'qr',
-            'timetable', 'notes', 'offline'
-        ]
-
-        self.education_keywords = [
-            'what is', 'explain', 'definition', 'formula',
-            'theorem', 'law', 'principle', 'concept'
-        ]
-
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
-        query_lower = query.lower()
+        query_lower = self._lower_query(query, context)
 
-        if any(kw in query_lower for kw in self.app_keywords):
+        tokens = self._query_tokens(query, context)
+        if not self.APP_KW.isdisjoint(tokens):
             return 0.9
 
-        if any(kw in query_lower for kw in self.education_keywords):
-            return 0.7
+        # An education hit cannot end the scan early, since a later app
+        # phrase still wins, so only the regex decides the remaining cases
+        score = 0.3
+        for match in _KEYWORD_RE.finditer(query_lower):
+            if match.lastgroup == 'app':
+                return 0.9
+            score = 0.7
 
-        return 0.3
+        return score
 
     def process_offline(self, query: str, context: Dict = None) -> Dict:
         """Process query using offline knowledge base"""
@@ -63,8 +113,8 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
         context = context or {}
         language = context.get('language', 'en')
 
-        if self._is_app_query(query):
-            return self._handle_app_query(query, language)
+        if self._is_app_query(self._lower_query(query, context)):
+            return self._handle_app_query(query, language, context.get('include_alternatives', False))
 
         return {
             'success': False,
@@ -88,15 +138,20 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
 
         return self.process_offline(query, context)
 
-    def _is_app_query(self, query: str) -> bool:
-        """Determine if query is about app functionality"""
-        query_lower = query.lower()
-        return any(kw in query_lower for kw in self.app_keywords)
+    def _is_app_query(self, query_lower: str) -> bool:
+        """Determine if (already lowercased) query is about app functionality"""
+        if not self.APP_KW.isdisjoint(query_lower.split()):
+            return True
 
-    def _handle_app_query(self, query: str, language: str = 'en') -> Dict:
-        """Handle app-related queries using FAQs"""
+        return any(match.lastgroup == 'app' for match in _KEYWORD_RE.finditer(query_lower))
 
-        faqs = self.knowledge_base.search_app_faqs(query, limit=3, language=language)
+    def _handle_app_query(self, query: str, language: str = 'en',
+                          include_alternatives: bool = False) -> Dict:
+        """Handle app-related queries using FAQs (alternatives only when asked for)"""
+
+        faqs = self.knowledge_base.search_app_faqs(
+            query, limit=3 if include_alternatives else 1, language=language
+        )
 
         if not faqs:
             return {
@@ -111,62 +166,75 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
 
         top_faq = faqs[0]
 
-        return {
+        response = {
             'success': True,
             'answer': top_faq['answer'],
             'question': top_faq['question'],
             'category': top_faq.get('category', 'app_help'),
             'source': 'offline_faq',
-            'confidence': 0.95,
-            'alternative_results': [
+            'confidence': 0.95
+        }
+
+        if include_alternatives:
+            response['alternative_results'] = [
                 {
                     'question': faq['question'],
                     'answer': faq['answer']
                 }
                 for faq in faqs[1:3]
-            ] if len(faqs) > 1 else []
-        }
+            ]
+
+        return response
 
     def _handle_educational_query(self, query: str, context: Dict, language: str = 'en') -> Dict:
         """Handle educational queries using knowledge base"""
 
         subject = context.get('subject')
         grade_level = context.get('grade_level')
+        include_alternatives = context.get('include_alternatives', False)
 
-        results = self.knowledge_base.search(
-            query=query,
-            limit=3,
+        results = self._search_knowledge(
+            query,
+            context,
+            limit=3 if include_alternatives else 1,
             language=language,
             subject=subject
         )
 
         if not results:
 
-            return self._search_syllabus_content(query, subject, grade_level, language)
+            return self._search_syllabus_content(
+                query, subject, grade_level, language, include_alternatives, context
+            )
 
         top_result = results[0]
 
-        return {
+        response = {
             'success': True,
             'answer': top_result['answer'],
             'question': top_result['question'],
             'subject': top_result.get('subject', 'General'),
             'grade_level': top_result.get('grade_level', 'All'),
             'source': 'offline_knowledge',
-            'confidence': top_result['similarity'],
-            'alternative_results': [
+            'confidence': top_result['similarity']
+        }
+
+        if include_alternatives:
+            response['alternative_results'] = [
                 {
                     'question': r['question'],
                     'answer': r['answer'],
                     'confidence': r['similarity']
                 }
                 for r in results[1:3]
-            ] if len(results) > 1 else []
-        }
+            ]
+
+        return response
 
     def _search_syllabus_content(self, query: str, subject: str,
-                                 grade_level: str, language: str) -> Dict:
-        """Search syllabus content as fallback"""
+                                 grade_level: str, language: str,
+                                 include_related: bool = False, context: Dict = None) -> Dict:
+        """Search syllabus content as fallback (related topics only when asked for)"""
         syllabus_items = self.knowledge_base.get_syllabus_content(
             subject=subject,
             grade_level=grade_level,
@@ -181,16 +249,19 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
                 'available_subjects': self._get_available_subjects()
             }
 
-        query_words = set(query.lower().split())
-
-        matched_items = []
-        for item in syllabus_items:
-            topic_words = set(item['topic'].lower().split())
-            content_words = set(item['content'].lower().split())
-
-            match_score = len(query_words & (topic_words | content_words))
-            if match_score > 0:
-                matched_items.append((match_score, item))
+        query_words = self._query_tokens(query, context)
+
+        # Only the best match and up to three related topics are used, so
+        # select those instead of sorting every matched item
+        matched_items = heapq.nlargest(
+            4 if include_related else 1,
+            (
+                (match_score, item)
+                for item in syllabus_items
+                if (match_score := len(query_words & _syllabus_tokens(item['topic'], item['content'])))
+            ),
+            key=itemgetter(0)
+        )
 
         if not matched_items:
             return {
@@ -199,10 +270,9 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
                 'available_topics': [item['topic'] for item in syllabus_items[:5]]
             }
 
-        matched_items.sort(reverse=True, key=lambda x: x[0])
         best_match = matched_items[0][1]
 
-        return {
+        response = {
             'success': True,
             'topic': best_match['topic'],
             'content': best_match['content'],
@@ -210,12 +280,16 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
             'grade_level': best_match['grade_level'],
             'difficulty': best_match.get('difficulty', 'medium'),
             'source': 'syllabus_content',
-            'confidence': min(matched_items[0][0] / 3, 1.0),
-            'related_topics': [
+            'confidence': min(matched_items[0][0] / 3, 1.0)
+        }
+
+        if include_related:
+            response['related_topics'] = [
                 item[1]['topic']
                 for item in matched_items[1:4]
             ]
-        }
+
+        return response
 
     def _get_available_subjects(self) -> List[str]:
         """Get list of available subjects"""
@@ -226,17 +300,7 @@ class OfflineKnowledgeAgent(ToolIntegrationMixin, BaseAgent):
 
     def _get_internet_required_message(self, language: str = 'en') -> str:
         """Get 'internet required' message in user's language"""
-        messages = {
-            'en': '🌐 Internet connection required for educational questions. I can only help with app usage questions in offline mode.',
-            'hi': '🌐 शैक्षिक प्रश्नों के लिए इंटरनेट कनेक्शन आवश्यक है। ऑफ़लाइन मोड में मैं केवल ऐप उपयोग प्रश्नों में मदद कर सकता हूं।',
-            'pa': '🌐 ਵਿਦਿਅਕ ਸਵਾਲਾਂ ਲਈ ਇੰਟਰਨੈੱਟ ਕਨੈਕਸ਼ਨ ਲੋੜੀਂਦਾ ਹੈ। ਔਫਲਾਈਨ ਮੋਡ ਵਿੱਚ ਮੈਂ ਸਿਰਫ਼ ਐਪ ਵਰਤੋਂ ਸਵਾਲਾਂ ਵਿੱਚ ਮਦਦ ਕਰ ਸਕਦਾ ਹਾਂ।',
-            'bn': '🌐 শিক্ষামূলক প্রশ্নের জন্য ইন্টারনেট সংযোগ প্রয়োজন। অফলাইন মোডে আমি শুধুমাত্র অ্যাপ ব্যবহারের প্রশ্নে সাহায্য করতে পারি।',
-            'ta': '🌐 கல்வி கேள்விகளுக்கு இணைய இணைப்பு தேவை. ஆஃப்லைன் பயன்முறையில் நான் ஆப் பயன்பாட்டு கேள்விகளில் மட்டுமே உதவ முடியும்.',
-            'te': '🌐 విద్యా ప్రశ్నలకు ఇంటర్నెట్ కనెక్షన్ అవసరం. ఆఫ్‌లైన్ మోడ్‌లో నేను యాప్ వినియోగ ప్రశ్నలలో మాత్రమే సహాయం చేయగలను।',
-            'mr': '🌐 शैक्षणिक प्रश्नांसाठी इंटरनेट कनेक्शन आवश्यक आहे. ऑफलाइन मोडमध्ये मी फक्त अॅप वापर प्रश्नांमध्ये मदत करू शकतो।',
-            'gu': '🌐 શૈક્ષણિક પ્રશ્નો માટે ઇન્ટરનેટ કનેક્શન જરૂરી છે. ઓફલાઇન મોડમાં હું ફક્ત એપ્લિકેશન ઉપયોગ પ્રશ્નોમાં મદદ કરી શકું છું।'
-        }
-        return messages.get(language, messages['en'])
+        return _INTERNET_MSGS.get(language, _INTERNET_MSGS['en'])
 
     def get_cached_topics(self, subject: str = None, grade_level: str = None) -> List[Dict]:
         """Get all cached topics for a subject/grade"""
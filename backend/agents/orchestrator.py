@@ -3,16 +3,39 @@ Agent Orchestrator - Central coordinator for all AI agents
 Routes queries to appropriate agents and manages multi-agent collaboration
 """
 
-from typing import Dict, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
 import logging
+import time
 from datetime import datetime
 
-from .base_agent import BaseAgent, AgentMode, AgentPriority
-from .offline_knowledge_agent import OfflineKnowledgeAgent
-from .study_assistant_agent import StudyAssistantAgent
-from .voice_language_agents import VoiceInterfaceAgent, LanguageSupportAgent
-from .assessment_content_agents import AssessmentAgent, ContentDiscoveryAgent
-from .study_path_accessibility_agents import StudyPathPlannerAgent, AccessibilityAgent
+from .base_agent import BaseAgent, AgentMode, AgentPriority, QueryContext, QUERY_CONTEXT_KEY
+
+_ROUTE_CACHE_SIZE = 1024
+_ROUTE_CACHE_TTL_S = 3600
+
+# Context flags read by agents' can_handle; routing can differ on them,
+# so they are part of the routing cache key
+_ROUTING_CONTEXT_KEYS = (
+    'voice_input', 'requires_voice_output', 'requires_translation', 'accessibility_mode'
+)
+
+# Keyword matches score at most this; only the context flags above force
+# a 1.0. Agents are polled in priority order, so once one reaches the
+# ceiling no agent polled after it can outrank it
+_KEYWORD_SCORE_CEILING = 0.95
+
+_MAX_SELECTED_AGENTS = 3
+
+# Monitoring polls these every few seconds; agent info rarely changes
+_HEALTH_CACHE_TTL_S = 5.0
+_AGENT_LIST_CACHE_TTL_S = 15.0
+
+_ENHANCE_WORKERS = 3
+_ENHANCE_TIMEOUT_S = 3.0
 
 class AgentOrchestrator:
     """
@@ -33,6 +56,26 @@ class AgentOrchestrator:
         self.agents: Dict[str, BaseAgent] = {}
         self._initialize_agents()
 
+        # Stable sort: equal priorities keep registration order, which is
+        # the tie-break _select_agents has always used
+        self._poll_order = sorted(self.agents.items(), key=lambda item: item[1].priority)
+
+        # Agent set and names are fixed after initialization
+        self._agent_meta = tuple((agent_id, agent.name) for agent_id, agent in self.agents.items())
+
+        # (normalized query, routing flags) -> (selected agents, stored at)
+        self._route_cache: OrderedDict = OrderedDict()
+
+        # Secondary-agent calls are I/O bound (YouTube, Gemini), so they fan
+        # out on a pool kept for the orchestrator's lifetime
+        self._enhance_pool = ThreadPoolExecutor(
+            max_workers=_ENHANCE_WORKERS, thread_name_prefix="enhance"
+        )
+
+        # (computed at, snapshot) for health_check / list_agents
+        self._health_cache: Tuple[float, Optional[Dict]] = (0.0, None)
+        self._agent_list_cache: Tuple[float, Optional[List[Dict]]] = (0.0, None)
+
         self.knowledge_base = None
         self.cache_manager = None
         self.syllabus_parser = None
@@ -41,31 +84,43 @@ class AgentOrchestrator:
             'total_queries': 0,
             'successful_responses': 0,
             'failed_responses': 0,
-            'agent_usage': {},
+            'agent_usage': Counter(),
             'avg_response_time_ms': 0
         }
 
     def _initialize_agents(self):
         """Initialize all 8 agents"""
+        # Agent modules (and the Gemini SDK behind them) are imported here
+        # rather than at module level, so importing the orchestrator is cheap
+        from ._gemini_client import get_gemini_model
+        from .offline_knowledge_agent import OfflineKnowledgeAgent
+        from .study_assistant_agent import StudyAssistantAgent
+        from .voice_language_agents import VoiceInterfaceAgent, LanguageSupportAgent
+        from .assessment_content_agents import AssessmentAgent, ContentDiscoveryAgent
+        from .study_path_accessibility_agents import StudyPathPlannerAgent, AccessibilityAgent
+
         self.logger.info("Initializing agents...")
 
         self.agents['offline_knowledge'] = OfflineKnowledgeAgent()
 
         gemini_key = self.config.get('gemini_api_key')
-        self.agents['study_assistant'] = StudyAssistantAgent(gemini_api_key=gemini_key)
+        gemini_model = None
+        if gemini_key:
+            try:
+                gemini_model = get_gemini_model(api_key=gemini_key)
+            except Exception as e:
+                self.logger.error(f"Failed to initialize Gemini: {e}")
+
+        self.agents['study_assistant'] = StudyAssistantAgent(
+            gemini_api_key=gemini_key, gemini_model=gemini_model
+        )
 
         google_cloud_key = self.config.get('google_cloud_key')
         self.agents['voice_interface'] = VoiceInterfaceAgent(google_cloud_key=google_cloud_key)
 
         self.agents['language_support'] = LanguageSupportAgent()
 
-        if gemini_key:
-            import google.generativeai as genai
-            genai.configure(api_key=gemini_key)
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            self.agents['assessment'] = AssessmentAgent(gemini_model=model)
-        else:
-            self.agents['assessment'] = AssessmentAgent()
+        self.agents['assessment'] = AssessmentAgent(gemini_model=gemini_model)
 
         youtube_key = self.config.get('youtube_api_key')
         self.agents['content_discovery'] = ContentDiscoveryAgent(youtube_api_key=youtube_key)
@@ -81,6 +136,7 @@ class AgentOrchestrator:
         self.knowledge_base = knowledge_base
         self.cache_manager = cache_manager
         self.syllabus_parser = syllabus_parser
+        self._health_cache = (0.0, None)
 
         tool_users = [
             'offline_knowledge',
@@ -113,50 +169,140 @@ class AgentOrchestrator:
         Returns:
             Response dictionary from selected agent
         """
-        start_time = datetime.now()
-        self.stats['total_queries'] += 1
+        start_ns = time.perf_counter_ns()
+        context = self._begin_query(query, context)
 
-        context = context or {}
+        try:
+            selected_agents = self._hinted_agents(context) or self._route(query, context)
+            return self._respond(query, context, selected_agents, start_ns)
+
+        except Exception as e:
+            return self._error_response(e)
+
+    async def process_query_async(self, query: str, context: Dict = None) -> Dict:
+        """
+        process_query for async callers
+
+        Routing is CPU-only keyword scoring and runs inline, with the same
+        ceiling early exit as process_query; the chosen agent runs in a
+        worker thread so the event loop stays free while it waits on Gemini
+        or other I/O.
+        """
+        start_ns = time.perf_counter_ns()
+        context = self._begin_query(query, context)
 
         try:
+            selected_agents = self._hinted_agents(context) or self._route(query, context)
+            return await asyncio.to_thread(self._respond, query, context, selected_agents, start_ns)
 
-            selected_agents = self._select_agents(query, context)
+        except Exception as e:
+            return self._error_response(e)
 
-            if not selected_agents:
-                return self._default_response(query, context)
+    def _begin_query(self, query: str, context: Optional[Dict]) -> Dict:
+        """Count the query and attach its QueryContext"""
+        self.stats['total_queries'] += 1
 
-            primary_agent_id, confidence = selected_agents[0]
-            primary_agent = self.agents[primary_agent_id]
+        context = context or {}
+        context[QUERY_CONTEXT_KEY] = QueryContext.from_query(query)
 
-            self.logger.info(f"Selected agent: {primary_agent.name} (confidence: {confidence:.2f})")
+        return context
 
-            response = primary_agent.process(query, context)
+    def _hinted_agents(self, context: Dict) -> Tuple[Tuple[str, float], ...]:
+        """
+        Agent named by the caller, if any
 
-            if len(selected_agents) > 1 and response.get('success'):
-                response = self._enhance_response(response, selected_agents[1:], query, context)
+        Callers that already know the agent (e.g. a running study session)
+        skip routing entirely.
+        """
+        hint = context.get('agent_hint') or context.get('preferred_agent')
+        if isinstance(hint, str) and hint in self.agents:
+            return ((hint, 1.0),)
 
-            if response.get('success'):
-                self.stats['successful_responses'] += 1
-            else:
-                self.stats['failed_responses'] += 1
+        return ()
 
-            self._update_agent_usage(primary_agent_id)
+    def _respond(self, query: str, context: Dict,
+                 selected_agents: Tuple[Tuple[str, float], ...], start_ns: int) -> Dict:
+        """Run the primary agent on the query and enhance its response"""
+        if not selected_agents:
+            return self._default_response(query, context)
 
-            elapsed = (datetime.now() - start_time).total_seconds() * 1000
-            response['total_response_time_ms'] = round(elapsed, 2)
+        primary_agent_id, confidence = selected_agents[0]
+        primary_agent = self.agents[primary_agent_id]
 
-            return response
+        self.logger.info(f"Selected agent: {primary_agent.name} (confidence: {confidence:.2f})")
 
-        except Exception as e:
-            self.logger.error(f"Error processing query: {e}")
+        response = primary_agent.process(query, context)
+
+        # A streamed answer goes back untouched: waiting on secondary
+        # agents would hold up the first chunk
+        if len(selected_agents) > 1 and response.get('success') and 'stream' not in response:
+            response = self._enhance_response(response, selected_agents[1:], query, context)
+
+        if response.get('success'):
+            self.stats['successful_responses'] += 1
+        else:
             self.stats['failed_responses'] += 1
 
-            return {
-                'success': False,
-                'error': str(e),
-                'message': 'An error occurred while processing your request',
-                'timestamp': datetime.now().isoformat()
-            }
+        self._update_agent_usage(primary_agent_id)
+
+        response['total_response_time_ms'] = round((time.perf_counter_ns() - start_ns) / 1_000_000, 2)
+
+        return response
+
+    def _error_response(self, error: Exception) -> Dict:
+        """Record a failed query and describe it"""
+        self.logger.error(f"Error processing query: {error}")
+        self.stats['failed_responses'] += 1
+
+        return {
+            'success': False,
+            'error': str(error),
+            'message': 'An error occurred while processing your request',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _route(self, query: str, context: Dict) -> Tuple[Tuple[str, float], ...]:
+        """
+        _select_agents behind an LRU cache with TTL
+
+        Agent scores depend only on the query text and a few context flags,
+        so repeated questions skip polling every agent.
+        """
+        key = self._route_key(context)
+
+        selected_agents = self._cached_route(key)
+        if selected_agents is None:
+            selected_agents = self._store_route(key, self._select_agents(query, context))
+
+        return selected_agents
+
+    @staticmethod
+    def _route_key(context: Dict) -> Tuple:
+        """Routing cache key: normalized query plus the routing flags"""
+        return (
+            context[QUERY_CONTEXT_KEY].lower.strip(),
+            tuple(bool(context.get(flag)) for flag in _ROUTING_CONTEXT_KEYS)
+        )
+
+    def _cached_route(self, key: Tuple) -> Optional[Tuple[Tuple[str, float], ...]]:
+        """Unexpired routing decision for key, or None"""
+        cached = self._route_cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < _ROUTE_CACHE_TTL_S:
+            self._route_cache.move_to_end(key)
+            return cached[0]
+
+        return None
+
+    def _store_route(self, key: Tuple, selected_agents: List[Tuple[str, float]]) -> Tuple[Tuple[str, float], ...]:
+        """Cache a routing decision, evicting the least recently used"""
+        selected_agents = tuple(selected_agents)
+
+        self._route_cache[key] = (selected_agents, time.monotonic())
+        self._route_cache.move_to_end(key)
+        if len(self._route_cache) > _ROUTE_CACHE_SIZE:
+            self._route_cache.popitem(last=False)
+
+        return selected_agents
 
     def _select_agents(self, query: str, context: Dict) -> List[Tuple[str, float]]:
         """
@@ -165,16 +311,37 @@ class AgentOrchestrator:
         Returns:
             List of (agent_id, confidence) tuples sorted by confidence
         """
+        # Scores are computed lazily, so agents after the first one to
+        # reach the ceiling are never polled
+        return self._rank_agents(
+            ((agent_id, agent, agent.score(query, context)) for agent_id, agent in self._poll_order),
+            context
+        )
+
+    def _rank_agents(self, scored: Iterable[Tuple[str, BaseAgent, float]], context: Dict) -> List[Tuple[str, float]]:
+        """
+        Pick up to three agents from (agent_id, agent, confidence) triples
+
+        scored must follow _poll_order; the first agent at the score ceiling
+        wins outright.
+        """
         agent_scores = []
 
-        for agent_id, agent in self.agents.items():
-            confidence = agent.can_handle(query, context)
+        ceiling = (
+            1.0 if any(context.get(flag) for flag in _ROUTING_CONTEXT_KEYS)
+            else _KEYWORD_SCORE_CEILING
+        )
+
+        for agent_id, agent, confidence in scored:
+            if confidence >= ceiling:
+                return [(agent_id, confidence)]
             if confidence > 0:
                 agent_scores.append((agent_id, confidence, agent.priority.value))
 
-        agent_scores.sort(key=lambda x: (-x[1], x[2]))
+        # Same order as sorted(...)[:3], ties included, without a full sort
+        top_scores = heapq.nsmallest(_MAX_SELECTED_AGENTS, agent_scores, key=lambda x: (-x[1], x[2]))
 
-        return [(agent_id, conf) for agent_id, conf, _ in agent_scores[:3]]
+        return [(agent_id, conf) for agent_id, conf, _ in top_scores]
 
     def _default_response(self, query: str, context: Dict) -> Dict:
         """Provide default response when no agent can handle the query"""
@@ -195,32 +362,51 @@ class AgentOrchestrator:
         Enhance primary response with insights from secondary agents
         """
         enhancements = {}
+        futures = {}
 
         for agent_id, confidence in secondary_agents[:2]:
+            if confidence <= 0.5:
+                continue
+
             agent = self.agents[agent_id]
 
             try:
 
-                if agent_id == 'content_discovery' and confidence > 0.5:
+                if agent_id == 'content_discovery':
 
                     video_context = context.copy()
                     video_context['subject'] = primary_response.get('subject')
-                    video_response = agent.process(query, video_context)
-
-                    if video_response.get('success'):
-                        enhancements['recommended_videos'] = video_response
+                    futures[self._enhance_pool.submit(agent.process, query, video_context)] = (
+                        agent_id, 'recommended_videos'
+                    )
 
-                elif agent_id == 'study_path_planner' and confidence > 0.5:
+                elif agent_id == 'study_path_planner':
 
                     enhancements['study_path_available'] = True
 
-                elif agent_id == 'assessment' and confidence > 0.5:
+                elif agent_id == 'assessment':
 
                     enhancements['practice_available'] = True
 
             except Exception as e:
                 self.logger.warning(f"Enhancement from {agent_id} failed: {e}")
 
+        if futures:
+            done, pending = wait(futures, timeout=_ENHANCE_TIMEOUT_S)
+
+            for future in done:
+                agent_id, key = futures[future]
+                try:
+                    agent_response = future.result()
+                    if agent_response.get('success'):
+                        enhancements[key] = agent_response
+                except Exception as e:
+                    self.logger.warning(f"Enhancement from {agent_id} failed: {e}")
+
+            for future in pending:
+                future.cancel()
+                self.logger.warning(f"Enhancement from {futures[future][0]} timed out")
+
         if enhancements:
             primary_response['enhancements'] = enhancements
 
@@ -228,8 +414,6 @@ class AgentOrchestrator:
 
     def _update_agent_usage(self, agent_id: str):
         """Update agent usage statistics"""
-        if agent_id not in self.stats['agent_usage']:
-            self.stats['agent_usage'][agent_id] = 0
         self.stats['agent_usage'][agent_id] += 1
 
     def get_agent(self, agent_id: str) -> Optional[BaseAgent]:
@@ -237,11 +421,19 @@ class AgentOrchestrator:
         return self.agents.get(agent_id)
 
     def list_agents(self) -> List[Dict]:
-        """Get information about all available agents"""
-        return [
+        """Get information about all available agents (snapshot, refreshed every 15s)"""
+        computed_at, agents_info = self._agent_list_cache
+        now = time.monotonic()
+        if agents_info is not None and now - computed_at < _AGENT_LIST_CACHE_TTL_S:
+            return agents_info
+
+        agents_info = [
             agent.get_info()
             for agent in self.agents.values()
         ]
+        self._agent_list_cache = (now, agents_info)
+
+        return agents_info
 
     def get_agent_by_capability(self, capability: str) -> List[BaseAgent]:
         """Get all agents with a specific capability"""
@@ -265,6 +457,8 @@ class AgentOrchestrator:
 
     def get_stats(self) -> Dict:
         """Get orchestrator statistics"""
+        agent_usage = self.stats['agent_usage']
+
         return {
             'total_queries': self.stats['total_queries'],
             'successful_responses': self.stats['successful_responses'],
@@ -273,20 +467,25 @@ class AgentOrchestrator:
                 self.stats['successful_responses'] / self.stats['total_queries'] * 100
                 if self.stats['total_queries'] > 0 else 0
             ),
-            'agent_usage': self.stats['agent_usage'],
+            'agent_usage': agent_usage,
             'total_agents': len(self.agents),
             'agents': [
                 {
                     'id': agent_id,
-                    'name': agent.name,
-                    'usage_count': self.stats['agent_usage'].get(agent_id, 0)
+                    'name': name,
+                    'usage_count': agent_usage[agent_id]
                 }
-                for agent_id, agent in self.agents.items()
+                for agent_id, name in self._agent_meta
             ]
         }
 
     def health_check(self) -> Dict:
-        """Check health status of all agents and tools"""
+        """Check health status of all agents and tools (snapshot, refreshed every 5s)"""
+        computed_at, health = self._health_cache
+        now = time.monotonic()
+        if health is not None and now - computed_at < _HEALTH_CACHE_TTL_S:
+            return health
+
         health = {
             'orchestrator': 'healthy',
             'agents': {},
@@ -305,6 +504,8 @@ class AgentOrchestrator:
         health['tools']['cache_manager'] = 'available' if self.cache_manager else 'not_initialized'
         health['tools']['syllabus_parser'] = 'available' if self.syllabus_parser else 'not_initialized'
 
+        self._health_cache = (now, health)
+
         return health
 
 _orchestrator_instance = None
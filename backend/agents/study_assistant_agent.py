@@ -4,12 +4,138 @@ AI-powered study helper for homework, explanations, and problem solving
 Works offline with cached content, enhanced online with Gemini API
 """
 
-from typing import Dict, List, Optional
-import google.generativeai as genai
+import functools
+import re
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Optional
+from ._gemini_client import generate_text, get_gemini_model
 from .base_agent import (
     BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin
 )
 
+_STUDY_KEYWORDS = (
+    'explain', 'solve', 'how to', 'what is', 'why',
+    'homework', 'problem', 'question', 'understand',
+    'learn', 'teach', 'example', 'steps', 'solution'
+)
+
+_SUBJECT_KEYWORDS = MappingProxyType({
+    'mathematics': ('math', 'algebra', 'geometry', 'calculus', 'equation', 'solve', 'calculate'),
+    'science': ('science', 'physics', 'chemistry', 'biology', 'experiment', 'theory'),
+    'social_science': ('history', 'geography', 'civics', 'politics', 'democracy'),
+    'english': ('english', 'grammar', 'essay', 'literature', 'poem')
+})
+
+_SUBJECT_NAMES = MappingProxyType({
+    subject: subject.replace('_', ' ').title() for subject in _SUBJECT_KEYWORDS
+})
+
+def _build_keyword_tags() -> Dict[str, frozenset]:
+    """Map each keyword to every tag ('study' or a subject) it signals"""
+    tags = {}
+    for kw in _STUDY_KEYWORDS:
+        tags.setdefault(kw, set()).add('study')
+    for subject, keywords in _SUBJECT_KEYWORDS.items():
+        for kw in keywords:
+            tags.setdefault(kw, set()).add(subject)
+
+    # The scan reports the longest keyword at each position, so a keyword
+    # also carries the tags of any shorter keyword it starts with
+    return {
+        kw: frozenset().union(*(tags[other] for other in tags if kw.startswith(other)))
+        for kw in tags
+    }
+
+_KEYWORD_TAGS = _build_keyword_tags()
+
+_TIPS_DATABASE = MappingProxyType({
+    'Mathematics': (
+        'Practice daily - even 15 minutes helps',
+        'Understand concepts before memorizing formulas',
+        'Solve previous year questions',
+        'Make a formula sheet for quick revision',
+        'Learn from mistakes - review wrong answers'
+    ),
+    'Science': (
+        'Connect theory with real-life examples',
+        'Draw diagrams to understand concepts better',
+        'Do experiments when possible',
+        'Make notes in your own words',
+        'Revise regularly with spaced repetition'
+    ),
+    'Social Science': (
+        'Make timeline charts for history',
+        'Use maps for geography topics',
+        'Connect events with their causes and effects',
+        'Make short notes for revision',
+        'Practice answer writing'
+    ),
+    'English': (
+        'Read daily - stories, newspapers, or books',
+        'Practice writing short paragraphs',
+        'Learn new words with their usage',
+        'Speak English with friends for practice',
+        'Listen to English content (audio/video)'
+    )
+})
+
+_DEFAULT_TIPS = (
+    'Study regularly in short sessions',
+    'Take breaks every 30-45 minutes',
+    'Teach concepts to others to strengthen understanding',
+    'Make your own notes',
+    'Practice active recall'
+)
+
+# Single pass over the query for study and subject keywords; the lookahead
+# tries every word start so overlapping keywords are all seen. Anchoring at
+# a word start keeps inflections ("mathematics", "explained") but drops
+# hits buried mid-word ("dissolve" is not "solve", "anyhow" is not "how")
+_KEYWORD_RE = re.compile(
+    r'(?=\b({}))'.format('|'.join(map(re.escape, sorted(_KEYWORD_TAGS, key=len, reverse=True))))
+)
+
+# Numbered lines of generated practice questions: a digit within the first
+# three characters ("1.", " 2)", "**3.**"), found in one scan of the text
+_QUESTION_LINE_RE = re.compile(r'^(.{0,2}\d.*)$', re.MULTILINE)
+
+@functools.lru_cache(maxsize=256)
+def _educational_prompt(subject: Optional[str], grade_level: str, language: str) -> str:
+    """Educational system prompt, built once per (subject, grade, language)"""
+    prompt = f"""You are a helpful study assistant for rural Indian students.
+
+Context:
+- Grade Level: {grade_level}
+- Subject: {subject or 'General'}
+- Language: {language}
+- Target Audience: Rural students with varying literacy levels
+
+Guidelines:
+1. Provide clear, simple explanations suitable for grade {grade_level}
+2. Use examples from everyday life and rural context when possible
+3. Break down complex concepts into simple steps
+4. Use Hindi/local language terms when relevant (but respond in {language})
+5. Be encouraging and supportive
+6. Provide practical study tips when appropriate
+7. Keep explanations concise but comprehensive
+
+For math problems:
+- Show step-by-step solutions
+- Explain the reasoning behind each step
+- Provide formula when relevant
+
+For science topics:
+- Explain with real-world examples
+- Relate to daily observations
+- Mention practical applications
+
+For other subjects:
+- Provide clear definitions
+- Use analogies and examples
+- Relate to student's context"""
+
+    return prompt
+
 class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
     """
     Intelligent study assistant
@@ -17,54 +143,60 @@ class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
     Online: Uses Gemini API for dynamic explanations
     """
 
-    def __init__(self, gemini_api_key: str = None):
+    __slots__ = ('knowledge_base', 'cache_manager', 'syllabus_parser', 'gemini_api_key', 'model')
+
+    study_keywords = _STUDY_KEYWORDS
+    subjects = _SUBJECT_KEYWORDS
+
+    # Whole-word view of the study keywords: a query token found here is a
+    # substring hit too, so it settles routing without the regex scan
+    STUDY_KEYWORDS = frozenset(_STUDY_KEYWORDS)
+    SUBJECTS = MappingProxyType({
+        subject: frozenset(keywords) for subject, keywords in _SUBJECT_KEYWORDS.items()
+    })
+
+    _CAPABILITIES = (
+        AgentCapability.TEXT_PROCESSING,
+        AgentCapability.CONTENT_GENERATION,
+        AgentCapability.ASSESSMENT
+    )
+
+    def __init__(self, gemini_api_key: str = None, gemini_model=None):
         super().__init__(
             agent_id="study_assistant",
             name="Study Assistant Agent",
             description="Helps with homework, explanations, problem solving, and study guidance",
-            capabilities=[
-                AgentCapability.TEXT_PROCESSING,
-                AgentCapability.CONTENT_GENERATION,
-                AgentCapability.ASSESSMENT
-            ],
+            capabilities=self._CAPABILITIES,
             priority=AgentPriority.HIGH,
             default_mode=AgentMode.AUTO
         )
 
         self.gemini_api_key = gemini_api_key
-        self.model = None
+        self.model = gemini_model
 
-        if gemini_api_key:
+        if self.model is None and gemini_api_key:
             try:
-                genai.configure(api_key=gemini_api_key)
-                self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+                self.model = get_gemini_model(api_key=gemini_api_key)
                 self.logger.info("Gemini model initialized for Study Assistant")
             except Exception as e:
                 self.logger.error(f"Failed to initialize Gemini: {e}")
 
-        self.study_keywords = [
-            'explain', 'solve', 'how to', 'what is', 'why',
-            'homework', 'problem', 'question', 'understand',
-            'learn', 'teach', 'example', 'steps', 'solution'
-        ]
-
-        self.subjects = {
-            'mathematics': ['math', 'algebra', 'geometry', 'calculus', 'equation', 'solve', 'calculate'],
-            'science': ['science', 'physics', 'chemistry', 'biology', 'experiment', 'theory'],
-            'social_science': ['history', 'geography', 'civics', 'politics', 'democracy'],
-            'english': ['english', 'grammar', 'essay', 'literature', 'poem']
-        }
-
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
-        query_lower = query.lower()
-
-        if any(kw in query_lower for kw in self.study_keywords):
+        if not self.STUDY_KEYWORDS.isdisjoint(self._query_tokens(query, context)):
             return 0.95
 
-        for subject_kws in self.subjects.values():
-            if any(kw in query_lower for kw in subject_kws):
-                return 0.8
+        query_lower = self._lower_query(query, context)
+
+        subject_hit = False
+        for match in _KEYWORD_RE.finditer(query_lower):
+            tags = _KEYWORD_TAGS[match.group(1)]
+            if 'study' in tags:
+                return 0.95
+            subject_hit = True
+
+        if subject_hit:
+            return 0.8
 
         if query.strip().endswith('?'):
             return 0.6
@@ -82,12 +214,13 @@ class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
 
         context = context or {}
 
-        subject = self._detect_subject(query)
+        subject = self._detect_subject(query, context)
         if subject and not context.get('subject'):
             context['subject'] = subject
 
-        results = self.knowledge_base.search(
-            query=query,
+        results = self._search_knowledge(
+            query,
+            context,
             limit=3,
             subject=context.get('subject'),
             language=context.get('language', 'en')
@@ -113,17 +246,24 @@ class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
 
         return self._provide_offline_guidance(query, context, subject)
 
-    def process_online(self, query: str, context: Dict = None) -> Dict:
-        """Process study query using Gemini API"""
+    def process_online(self, query: str, context: Dict = None, stream: bool = False) -> Dict:
+        """
+        Process study query using Gemini API
+
+        With stream (or context['stream']) set, the response carries a
+        'stream' generator of answer text chunks instead of 'answer', so the
+        caller can forward text as Gemini produces it.
+        """
         if not self.model:
 
             self.logger.warning("Gemini API not available, falling back to offline mode")
             return self.process_offline(query, context)
 
         context = context or {}
-        subject = self._detect_subject(query)
+        subject = self._detect_subject(query, context)
         grade_level = context.get('grade_level', '10')
         language = context.get('language', 'en')
+        stream = stream or bool(context.get('stream'))
 
         system_prompt = self._build_educational_prompt(subject, grade_level, language)
 
@@ -131,14 +271,24 @@ class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
 
             full_prompt = f"{system_prompt}\n\nStudent Question: {query}"
 
-            response = self.model.generate_content(full_prompt)
-            answer = response.text
-
-            related = self.knowledge_base.search(query, limit=3) if self.knowledge_base else []
+            if stream:
+                chunks = self.model.generate_content(full_prompt, stream=True)
+                body = {'stream': self._stream_answer(chunks, query, context)}
+            else:
+                body = {'answer': generate_text(self.model, full_prompt)}
+
+            # Same filters as process_offline, so a fallback reuses this search
+            related = self._search_knowledge(
+                query,
+                context,
+                limit=3,
+                subject=context.get('subject') or subject,
+                language=language
+            ) if self.knowledge_base else []
 
             return {
                 'success': True,
-                'answer': answer,
+                **body,
                 'question': query,
                 'subject': subject or 'General',
                 'grade_level': grade_level,
@@ -162,52 +312,46 @@ class StudyAssistantAgent(ToolIntegrationMixin, BaseAgent):
             offline_response['note'] = 'Online AI unavailable, using cached content'
             return offline_response
 
-    def _detect_subject(self, query: str) -> Optional[str]:
-        """Detect subject from query keywords"""
-        query_lower = query.lower()
-
-        for subject, keywords in self.subjects.items():
-            if any(kw in query_lower for kw in keywords):
+    def _stream_answer(self, chunks: Iterable, query: str, context: Dict) -> Iterator[str]:
+        """
+        Forward Gemini text chunks, recovering from a mid-stream failure
 
-                return subject.replace('_', ' ').title()
+        Errors surface while the response is already being sent, so they
+        cannot become an error status: before any text, the offline answer
+        is sent instead; after it, a short notice ends the stream.
+        """
+        sent_text = False
+        try:
+            for chunk in chunks:
+                sent_text = True
+                yield chunk.text
+        except Exception as e:
+            self.logger.error(f"Gemini stream failed: {e}")
 
-        return None
+            if sent_text:
+                yield '\n\n[Answer interrupted. Please try again.]'
+                return
 
-    def _build_educational_prompt(self, subject: str, grade_level: str, language: str) -> str:
-        """Build educational system prompt for Gemini"""
-        prompt = f"""You are a helpful study assistant for rural Indian students.
-
-Context:
-- Grade Level: {grade_level}
-- Subject: {subject or 'General'}
-- Language: {language}
-- Target Audience: Rural students with varying literacy levels
+            offline_response = self.process_offline(query, context)
+            yield offline_response.get('answer') or offline_response.get('message', '')
 
-Guidelines:
-1. Provide clear, simple explanations suitable for grade {grade_level}
-2. Use examples from everyday life and rural context when possible
-3. Break down complex concepts into simple steps
-4. Use Hindi/local language terms when relevant (but respond in {language})
-5. Be encouraging and supportive
-6. Provide practical study tips when appropriate
-7. Keep explanations concise but comprehensive
+    def _detect_subject(self, query: str, context: Dict = None) -> Optional[str]:
+        """Detect subject from query keywords"""
+        query_lower = self._lower_query(query, context)
 
-For math problems:
-- Show step-by-step solutions
-- Explain the reasoning behind each step
-- Provide formula when relevant
+        found = set()
+        for match in _KEYWORD_RE.finditer(query_lower):
+            found |= _KEYWORD_TAGS[match.group(1)]
 
-For science topics:
-- Explain with real-world examples
-- Relate to daily observations
-- Mention practical applications
+        for subject, name in _SUBJECT_NAMES.items():
+            if subject in found:
+                return name
 
-For other subjects:
-- Provide clear definitions
-- Use analogies and examples
-- Relate to student's context"""
+        return None
 
-        return prompt
+    def _build_educational_prompt(self, subject: str, grade_level: str, language: str) -> str:
+        """Build educational system prompt for Gemini"""
+        return _educational_prompt(subject, grade_level, language)
 
     def _provide_offline_guidance(self, query: str, context: Dict, subject: str) -> Dict:
         """Provide limited guidance when no cached answer available"""
@@ -246,14 +390,9 @@ Difficulty level: {difficulty}
 Format: Return questions numbered 1-{count}, each on a new line.
 Make questions suitable for self-study and practice."""
 
-            response = self.model.generate_content(prompt)
-            questions_text = response.text
+            questions_text = generate_text(self.model, prompt)
 
-            questions = [
-                q.strip()
-                for q in questions_text.split('\n')
-                if q.strip() and any(c.isdigit() for c in q[:3])
-            ]
+            questions = [q.strip() for q in _QUESTION_LINE_RE.findall(questions_text)]
 
             return {
                 'success': True,
@@ -273,44 +412,7 @@ Make questions suitable for self-study and practice."""
 
     def get_study_tips(self, subject: str, context: Dict = None) -> Dict:
         """Get study tips for a subject"""
-        tips_database = {
-            'Mathematics': [
-                'Practice daily - even 15 minutes helps',
-                'Understand concepts before memorizing formulas',
-                'Solve previous year questions',
-                'Make a formula sheet for quick revision',
-                'Learn from mistakes - review wrong answers'
-            ],
-            'Science': [
-                'Connect theory with real-life examples',
-                'Draw diagrams to understand concepts better',
-                'Do experiments when possible',
-                'Make notes in your own words',
-                'Revise regularly with spaced repetition'
-            ],
-            'Social Science': [
-                'Make timeline charts for history',
-                'Use maps for geography topics',
-                'Connect events with their causes and effects',
-                'Make short notes for revision',
-                'Practice answer writing'
-            ],
-            'English': [
-                'Read daily - stories, newspapers, or books',
-                'Practice writing short paragraphs',
-                'Learn new words with their usage',
-                'Speak English with friends for practice',
-                'Listen to English content (audio/video)'
-            ]
-        }
-
-        tips = tips_database.get(subject, [
-            'Study regularly in short sessions',
-            'Take breaks every 30-45 minutes',
-            'Teach concepts to others to strengthen understanding',
-            'Make your own notes',
-            'Practice active recall'
-        ])
+        tips = _TIPS_DATABASE.get(subject, _DEFAULT_TIPS)
 
         return {
             'success': True,
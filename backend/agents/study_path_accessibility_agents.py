@@ -2,17 +2,152 @@
 Study Path Planner & Accessibility Agents - Agents #7 & #8
 """
 
+import functools
+import json
+import re
+import time
+from collections import OrderedDict
+from itertools import islice
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from .base_agent import (
-    BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin
+    BaseAgent, AgentMode, AgentCapability, AgentPriority, ToolIntegrationMixin,
+    KeywordAutomaton
 )
 
+_PLANNING_KEYWORDS = (
+    'study plan', 'learning path', 'syllabus', 'schedule',
+    'prepare for', 'roadmap', 'study schedule', 'planning',
+    'what to study', 'study order', 'curriculum'
+)
+
+_ACCESSIBILITY_KEYWORDS = (
+    'accessibility', 'screen reader', 'high contrast',
+    'large text', 'voice navigation', 'captions',
+    'color blind', 'disability', 'visual aid'
+)
+
+# Substring scan of both keyword lists in one pass per request, for queries
+# whose tokens miss the whole-word sets below ("syllabuses", "study plan")
+_ROUTING_KEYWORDS = KeywordAutomaton('study_path_accessibility', {
+    'planning': _PLANNING_KEYWORDS,
+    'accessibility': _ACCESSIBILITY_KEYWORDS
+})
+
+# Markdown markers dropped and punctuation spaced out for screen readers,
+# all in one str.translate pass
+_SCREEN_READER_TRANS = str.maketrans({'#': None, '*': None, '_': None, '.': '. ', ',': ', '})
+
+_COMPLEX_WORD_LEN = 12
+_COMPLEX_WORD_LIMIT = 5
+_COMPLEX_WORD_RE = re.compile(r'\S{%d,}' % (_COMPLEX_WORD_LEN + 1))
+
+_DEFAULT_ALT_TEXT = 'Educational diagram'
+
+_PATH_CACHE_SIZE = 256
+_PATH_CACHE_TTL_S = 5.0
+
+# Review due dates move on a scale of days, so a few minutes' staleness is
+# harmless; a user's entries are dropped as soon as they record progress
+_REVIEW_CACHE_SIZE = 1024
+_REVIEW_CACHE_TTL_S = 300.0
+
+@functools.lru_cache(maxsize=None)
+def _topic_status_map() -> MappingProxyType:
+    """
+    Progress status names -> TopicStatus, built on first use
+
+    tools.syllabus_parser is imported here rather than at module level:
+    importing the tools package loads the knowledge base's numpy stack.
+    """
+    from tools.syllabus_parser import TopicStatus
+
+    return MappingProxyType({
+        'completed': TopicStatus.COMPLETED,
+        'in_progress': TopicStatus.IN_PROGRESS,
+        'not_started': TopicStatus.NOT_STARTED
+    })
+
+_FEATURES = MappingProxyType({
+    'screen_reader': {
+        'name': 'Screen Reader Support',
+        'description': 'Text-to-speech for all content',
+        'available_offline': True
+    },
+    'high_contrast': {
+        'name': 'High Contrast Mode',
+        'description': 'Enhanced visibility with high contrast themes',
+        'available_offline': True
+    },
+    'large_text': {
+        'name': 'Large Text',
+        'description': 'Increased font size for better readability',
+        'available_offline': True
+    },
+    'captions': {
+        'name': 'Closed Captions',
+        'description': 'Captions for audio/video content',
+        'available_offline': False
+    },
+    'voice_navigation': {
+        'name': 'Voice Navigation',
+        'description': 'Navigate app using voice commands',
+        'available_offline': True
+    },
+    'color_blind_mode': {
+        'name': 'Color Blind Friendly',
+        'description': 'Color schemes for color blindness',
+        'available_offline': True
+    }
+})
+
+# Column views of _FEATURES for whole-table queries, so listing or
+# filtering features does not walk the nested dicts
+_FEATURE_IDS = tuple(_FEATURES)
+_OFFLINE_FEATURE_IDS = tuple(
+    feature_id for feature_id, info in _FEATURES.items() if info['available_offline']
+)
+
+# Default settings per feature; _get_feature_settings hands out copies
+_FEATURE_SETTINGS = MappingProxyType({
+    'screen_reader': {
+        'speech_rate': 1.0,
+        'pitch': 1.0,
+        'volume': 1.0,
+        'auto_read': False
+    },
+    'high_contrast': {
+        'theme': 'dark',
+        'contrast_level': 'high'
+    },
+    'large_text': {
+        'font_scale': 1.5,
+        'minimum_size': 18
+    },
+    'voice_navigation': {
+        'activation_phrase': 'Hello App',
+        'continuous_listening': False
+    },
+    'color_blind_mode': {
+        'mode': 'deuteranopia',
+        'options': ('protanopia', 'deuteranopia', 'tritanopia')
+    }
+})
+
 class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
     """
     Agent #7 - Study Path Planner Agent
     Creates personalized learning paths based on syllabus and user progress
     """
 
+    __slots__ = (
+        'knowledge_base', 'cache_manager', 'syllabus_parser', '_path_cache', '_review_cache'
+    )
+
+    # Whole-word view of the keywords: a query token found here is a
+    # substring hit too, so it settles routing without the regex scan
+    PLANNING_KW = frozenset(_PLANNING_KEYWORDS)
+
     def __init__(self):
         super().__init__(
             agent_id="study_path_planner",
@@ -26,17 +161,18 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
             default_mode=AgentMode.AUTO
         )
 
+        # path_id -> (fetched at, get_study_path_summary result)
+        self._path_cache: OrderedDict = OrderedDict()
+
+        # (user_id, subject) -> (expires at, projected review topics)
+        self._review_cache: OrderedDict = OrderedDict()
+
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
-        query_lower = query.lower()
-
-        planning_keywords = [
-            'study plan', 'learning path', 'syllabus', 'schedule',
-            'prepare for', 'roadmap', 'study schedule', 'planning',
-            'what to study', 'study order', 'curriculum'
-        ]
+        if not self.PLANNING_KW.isdisjoint(self._query_tokens(query, context)):
+            return 0.95
 
-        if any(kw in query_lower for kw in planning_keywords):
+        if 'planning' in _ROUTING_KEYWORDS.hits(query, context):
             return 0.95
 
         return 0.2
@@ -73,17 +209,6 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
                 'suggestion': 'Try different subject or connect to internet for more content'
             }
 
-        existing_paths = self._get_user_paths(user_id, subject)
-
-        if existing_paths:
-            return {
-                'success': True,
-                'has_existing_path': True,
-                'paths': existing_paths,
-                'message': 'You already have study paths for this subject',
-                'action': 'continue_existing_or_create_new'
-            }
-
         return self._create_new_study_path(user_id, subject, grade_level, topics, context)
 
     def process_online(self, query: str, context: Dict = None) -> Dict:
@@ -93,13 +218,6 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
         """
         return self.process_offline(query, context)
 
-    def _get_user_paths(self, user_id: str, subject: str = None) -> List[Dict]:
-        """Get existing study paths for user"""
-        if not self.syllabus_parser:
-            return []
-
-        return []
-
     def _create_new_study_path(self, user_id: str, subject: str,
                                grade_level: str, topics: List[Dict],
                                context: Dict) -> Dict:
@@ -122,7 +240,7 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
                 'error': path_result['error']
             }
 
-        path_details = self.syllabus_parser.get_study_path_details(path_result['path_id'])
+        items = path_result['items']
 
         return {
             'success': True,
@@ -133,16 +251,40 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
                 'total_topics': path_result['total_topics'],
                 'duration_weeks': target_weeks,
                 'estimated_hours': path_result['estimated_hours'],
-                'topics': path_details['items']
+                'topics': items
             },
             'next_steps': {
                 'action': 'start_learning',
-                'next_topic': path_details['items'][0] if path_details['items'] else None,
+                'next_topic': items[0] if items else None,
                 'recommendation': 'Begin with the first topic in your study path'
             },
             'mode': 'offline'
         }
 
+    def _cached_path_summary(self, path_id: int) -> Dict:
+        """get_study_path_summary, reusing a result fetched in the last few seconds"""
+        cached = self._path_cache.get(path_id)
+        if cached is not None and time.monotonic() - cached[0] < _PATH_CACHE_TTL_S:
+            self._path_cache.move_to_end(path_id)
+            return cached[1]
+
+        return self._refresh_path_summary(path_id)
+
+    def _refresh_path_summary(self, path_id: int) -> Dict:
+        """Fetch a study path summary from the parser and cache it"""
+        path_summary = self.syllabus_parser.get_study_path_summary(path_id)
+
+        if 'error' in path_summary:
+            self._path_cache.pop(path_id, None)
+            return path_summary
+
+        self._path_cache[path_id] = (time.monotonic(), path_summary)
+        self._path_cache.move_to_end(path_id)
+        if len(self._path_cache) > _PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+
+        return path_summary
+
     def get_next_topic(self, user_id: str, path_id: int) -> Dict:
         """Get the next topic user should study"""
         if not self.syllabus_parser:
@@ -185,17 +327,11 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
                 'error': 'Syllabus parser not available'
             }
 
-        from tools.syllabus_parser import TopicStatus
-        status_map = {
-            'completed': TopicStatus.COMPLETED,
-            'in_progress': TopicStatus.IN_PROGRESS,
-            'not_started': TopicStatus.NOT_STARTED
-        }
-
-        topic_status = status_map.get(status, TopicStatus.IN_PROGRESS)
+        status_map = _topic_status_map()
+        topic_status = status_map.get(status, status_map['in_progress'])
 
-        path_details = self.syllabus_parser.get_study_path_details(path_id)
-        subject = path_details.get('subject', 'Unknown')
+        path_summary = self._cached_path_summary(path_id)
+        subject = path_summary.get('subject', 'Unknown')
 
         self.syllabus_parser.update_topic_progress(
             user_id=user_id,
@@ -206,11 +342,50 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
             mastery_level=3 if status == 'completed' else None
         )
 
-        updated_path = self.syllabus_parser.get_study_path_details(path_id)
+        return self._progress_updated(user_id, path_id, f'Progress updated for: {topic}')
+
+    def update_progress_batch(self, user_id: str, path_id: int, updates: List[Dict]) -> Dict:
+        """
+        Update progress on several topics of a path in one transaction
+
+        Args:
+            updates: Dicts with 'topic', 'status' and optional 'time_spent',
+                     as taken by update_progress
+        """
+        if not self.syllabus_parser:
+            return {
+                'success': False,
+                'error': 'Syllabus parser not available'
+            }
+
+        status_map = _topic_status_map()
+        in_progress = status_map['in_progress']
+
+        path_summary = self._cached_path_summary(path_id)
+        subject = path_summary.get('subject', 'Unknown')
+
+        self.syllabus_parser.bulk_update_topic_progress(user_id, subject, [
+            (
+                update['topic'],
+                status_map.get(update['status'], in_progress),
+                update.get('time_spent', 0),
+                3 if update['status'] == 'completed' else None
+            )
+            for update in updates
+        ])
+
+        return self._progress_updated(user_id, path_id, f'Progress updated for {len(updates)} topics')
+
+    def _progress_updated(self, user_id: str, path_id: int, message: str) -> Dict:
+        """Drop the user's cached review topics and report the path's progress"""
+        for key in [key for key in self._review_cache if key[0] == user_id]:
+            del self._review_cache[key]
+
+        updated_path = self._refresh_path_summary(path_id)
 
         return {
             'success': True,
-            'message': f'Progress updated for: {topic}',
+            'message': message,
             'progress_percentage': updated_path.get('progress_percentage', 0),
             'completed_topics': updated_path.get('completed_topics', 0),
             'total_topics': updated_path.get('total_topics', 0)
@@ -224,23 +399,35 @@ class StudyPathPlannerAgent(ToolIntegrationMixin, BaseAgent):
                 'error': 'Syllabus parser not available'
             }
 
-        review_topics = self.syllabus_parser.get_topics_due_for_review(
-            user_id=user_id,
-            subject=subject
-        )
+        key = (user_id, subject)
+        cached = self._review_cache.get(key)
 
-        return {
-            'success': True,
-            'review_count': len(review_topics),
-            'topics': [
+        if cached is not None and time.monotonic() < cached[0]:
+            self._review_cache.move_to_end(key)
+            review_topics = cached[1]
+        else:
+            review_topics = [
                 {
                     'topic': t['topic'],
                     'subject': t['subject'],
                     'last_studied': t['last_studied'],
                     'mastery_level': t['mastery_level']
                 }
-                for t in review_topics
-            ],
+                for t in self.syllabus_parser.get_topics_due_for_review(
+                    user_id=user_id,
+                    subject=subject
+                )
+            ]
+
+            self._review_cache[key] = (time.monotonic() + _REVIEW_CACHE_TTL_S, review_topics)
+            self._review_cache.move_to_end(key)
+            if len(self._review_cache) > _REVIEW_CACHE_SIZE:
+                self._review_cache.popitem(last=False)
+
+        return {
+            'success': True,
+            'review_count': len(review_topics),
+            'topics': list(review_topics),
             'recommendation': 'Review these topics to strengthen your understanding' if review_topics else 'No topics due for review'
         }
 
@@ -250,6 +437,15 @@ class AccessibilityAgent(BaseAgent):
     Provides accessibility features for users with disabilities
     """
 
+    __slots__ = ()
+
+    ACCESSIBILITY_KW = frozenset(_ACCESSIBILITY_KEYWORDS)
+
+    features = _FEATURES
+
+    # get_features_json payload, shared by all instances once built
+    _features_json: Optional[bytes] = None
+
     def __init__(self):
         super().__init__(
             agent_id="accessibility",
@@ -264,39 +460,6 @@ class AccessibilityAgent(BaseAgent):
             default_mode=AgentMode.OFFLINE
         )
 
-        self.features = {
-            'screen_reader': {
-                'name': 'Screen Reader Support',
-                'description': 'Text-to-speech for all content',
-                'available_offline': True
-            },
-            'high_contrast': {
-                'name': 'High Contrast Mode',
-                'description': 'Enhanced visibility with high contrast themes',
-                'available_offline': True
-            },
-            'large_text': {
-                'name': 'Large Text',
-                'description': 'Increased font size for better readability',
-                'available_offline': True
-            },
-            'captions': {
-                'name': 'Closed Captions',
-                'description': 'Captions for audio/video content',
-                'available_offline': False
-            },
-            'voice_navigation': {
-                'name': 'Voice Navigation',
-                'description': 'Navigate app using voice commands',
-                'available_offline': True
-            },
-            'color_blind_mode': {
-                'name': 'Color Blind Friendly',
-                'description': 'Color schemes for color blindness',
-                'available_offline': True
-            }
-        }
-
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent can handle the query"""
         context = context or {}
@@ -304,14 +467,10 @@ class AccessibilityAgent(BaseAgent):
         if context.get('accessibility_mode'):
             return 1.0
 
-        query_lower = query.lower()
-        accessibility_keywords = [
-            'accessibility', 'screen reader', 'high contrast',
-            'large text', 'voice navigation', 'captions',
-            'color blind', 'disability', 'visual aid'
-        ]
+        if not self.ACCESSIBILITY_KW.isdisjoint(self._query_tokens(query, context)):
+            return 0.95
 
-        if any(kw in query_lower for kw in accessibility_keywords):
+        if 'accessibility' in _ROUTING_KEYWORDS.hits(query, context):
             return 0.95
 
         return 0.0
@@ -344,7 +503,8 @@ class AccessibilityAgent(BaseAgent):
         """Get list of available accessibility features"""
         return {
             'success': True,
-            'features': self.features,
+            'features': dict(self.features),
+            'offline_available': list(_OFFLINE_FEATURE_IDS),
             'recommendation': 'Enable features based on your needs',
             'quick_access': [
                 'screen_reader',
@@ -353,13 +513,28 @@ class AccessibilityAgent(BaseAgent):
             ]
         }
 
+    def get_features_json(self) -> bytes:
+        """
+        _get_accessibility_features as UTF-8 JSON, serialized once
+
+        The feature table never changes, so HTTP handlers can send these
+        bytes as-is instead of re-encoding the same payload per request.
+        """
+        features_json = AccessibilityAgent._features_json
+        if features_json is None:
+            features_json = AccessibilityAgent._features_json = json.dumps(
+                self._get_accessibility_features(), ensure_ascii=False
+            ).encode('utf-8')
+
+        return features_json
+
     def _enable_feature(self, feature_name: str) -> Dict:
         """Enable an accessibility feature"""
         if not feature_name or feature_name not in self.features:
             return {
                 'success': False,
                 'error': f'Feature {feature_name} not found',
-                'available_features': list(self.features.keys())
+                'available_features': list(_FEATURE_IDS)
             }
 
         feature = self.features[feature_name]
@@ -375,32 +550,7 @@ class AccessibilityAgent(BaseAgent):
 
     def _get_feature_settings(self, feature_name: str) -> Dict:
         """Get settings for an accessibility feature"""
-        settings = {
-            'screen_reader': {
-                'speech_rate': 1.0,
-                'pitch': 1.0,
-                'volume': 1.0,
-                'auto_read': False
-            },
-            'high_contrast': {
-                'theme': 'dark',
-                'contrast_level': 'high'
-            },
-            'large_text': {
-                'font_scale': 1.5,
-                'minimum_size': 18
-            },
-            'voice_navigation': {
-                'activation_phrase': 'Hello App',
-                'continuous_listening': False
-            },
-            'color_blind_mode': {
-                'mode': 'deuteranopia',
-                'options': ['protanopia', 'deuteranopia', 'tritanopia']
-            }
-        }
-
-        return settings.get(feature_name, {})
+        return dict(_FEATURE_SETTINGS.get(feature_name, {}))
 
     def _format_for_accessibility(self, content: str, context: Dict) -> Dict:
         """Format content for accessibility"""
@@ -413,14 +563,14 @@ class AccessibilityAgent(BaseAgent):
             accessibility_metadata['screen_reader_text'] = self._generate_screen_reader_text(content)
 
         if 'images' in context:
-            accessibility_metadata['alt_texts'] = [
-                'Educational diagram' for _ in context['images']
-            ]
+            accessibility_metadata['alt_texts'] = [_DEFAULT_ALT_TEXT] * len(context['images'])
+
+        words = content.split()
 
         accessibility_metadata['structure'] = {
-            'has_headings': content.count('#') > 0,
+            'has_headings': '#' in content,
             'has_lists': '-' in content or '*' in content,
-            'word_count': len(content.split())
+            'word_count': len(words)
         }
 
         return {
@@ -428,21 +578,16 @@ class AccessibilityAgent(BaseAgent):
             'original_content': content,
             'formatted_content': formatted_content,
             'accessibility_metadata': accessibility_metadata,
-            'recommendations': self._get_content_recommendations(content)
+            'recommendations': self._get_content_recommendations(content, words)
         }
 
     def _generate_screen_reader_text(self, content: str) -> str:
         """Generate optimized text for screen readers"""
 
-        text = content.replace('#', '').replace('*', '').replace('_', '')
-
-        text = text.replace('.', '. ')
-        text = text.replace(',', ', ')
+        return content.translate(_SCREEN_READER_TRANS).strip()
 
-        return text.strip()
-
-    def _get_content_recommendations(self, content: str) -> List[str]:
-        """Get recommendations for improving accessibility"""
+    def _get_content_recommendations(self, content: str, words: List[str] = None) -> List[str]:
+        """Get recommendations for improving accessibility (words: content.split(), if already done)"""
         recommendations = []
 
         if len(content) > 500:
@@ -451,9 +596,12 @@ class AccessibilityAgent(BaseAgent):
         if content.isupper():
             recommendations.append('Avoid all caps text for better readability')
 
-        words = content.split()
-        complex_words = [w for w in words if len(w) > 12]
-        if len(complex_words) > 5:
+        complex_words = (
+            (w for w in words if len(w) > _COMPLEX_WORD_LEN) if words is not None
+            else _COMPLEX_WORD_RE.finditer(content)
+        )
+        # Only "more than five" matters, so stop at the sixth complex word
+        if next(islice(complex_words, _COMPLEX_WORD_LIMIT, None), None) is not None:
             recommendations.append('Consider simplifying complex words')
 
         return recommendations if recommendations else ['Content is well-formatted for accessibility']
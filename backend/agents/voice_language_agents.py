@@ -4,11 +4,162 @@ Handles voice input/output with TTS and STT
 Provides voice-first accessibility for low-literacy users
 """
 
-from typing import Dict, List, Optional
+import asyncio
+import base64
+import logging
+import re
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
 from .base_agent import (
     BaseAgent, AgentMode, AgentCapability, AgentPriority
 )
 
+logger = logging.getLogger(__name__)
+
+_VOICE_KEYWORDS = ('speak', 'listen', 'voice', 'audio', 'say', 'hear', 'read aloud')
+
+_TRANSLATION_KEYWORDS = (
+    'translate', 'meaning in', 'hindi me', 'punjabi me',
+    'क्या मतलब', 'किसे कहते हैं', 'ਕੀ ਹੈ'
+)
+
+# Shared by every instance; read-only so no agent can change another's view
+_SUPPORTED_LANGUAGES = MappingProxyType({
+    'en': {'name': 'English', 'code': 'en-IN', 'available_offline': True},
+    'hi': {'name': 'Hindi', 'code': 'hi-IN', 'available_offline': True},
+    'pa': {'name': 'Punjabi', 'code': 'pa-IN', 'available_offline': False}
+})
+
+_LANGUAGES = MappingProxyType({
+    'en': 'English',
+    'hi': 'Hindi',
+    'pa': 'Punjabi'
+})
+
+_UI_TRANSLATIONS = MappingProxyType({
+    lang: MappingProxyType(translations) for lang, translations in {
+        'hi': {
+            'home': 'होम',
+            'notes': 'नोट्स',
+            'timetable': 'समय सारणी',
+            'profile': 'प्रोफ़ाइल',
+            'settings': 'सेटिंग्स',
+            'help': 'मदद',
+            'scan': 'स्कैन करें',
+            'share': 'शेयर करें',
+            'save': 'सहेजें',
+            'cancel': 'रद्द करें'
+        },
+        'pa': {
+            'home': 'ਘਰ',
+            'notes': 'ਨੋਟਸ',
+            'timetable': 'ਸਮਾਂ ਸਾਰਣੀ',
+            'profile': 'ਪ੍ਰੋਫਾਈਲ',
+            'settings': 'ਸੈਟਿੰਗਜ਼',
+            'help': 'ਮਦਦ',
+            'scan': 'ਸਕੈਨ',
+            'share': 'ਸਾਂਝਾ',
+            'save': 'ਸੰਭਾਲੋ',
+            'cancel': 'ਰੱਦ'
+        }
+    }.items()
+})
+
+# (language, lowercase element) -> translation, for a single-lookup hit
+_FLAT_UI_TRANSLATIONS = MappingProxyType({
+    (lang, element): translated
+    for lang, translations in _UI_TRANSLATIONS.items()
+    for element, translated in translations.items()
+})
+
+_VOICE_RE = re.compile('|'.join(map(re.escape, _VOICE_KEYWORDS)))
+_TRANSLATION_RE = re.compile('|'.join(map(re.escape, _TRANSLATION_KEYWORDS)))
+
+class StreamingVoicePipeline:
+    """
+    Speaks LLM output while it is still being generated
+
+    An encoder task cuts the incoming text chunks into sentences on a text
+    queue, a decoder task synthesizes each sentence onto an audio queue, and
+    stream() yields that audio. Both stages run at once, so total time is
+    close to the slower stage rather than the sum of the two. A None on
+    either queue marks the end of the stream.
+    """
+
+    __slots__ = ('tts_service', 'language', 'voice', 'speed', 'pitch')
+
+    def __init__(self, tts_service, language: str = 'en', voice: Optional[str] = None,
+                 speed: float = 1.0, pitch: float = 0.0):
+        self.tts_service = tts_service
+        self.language = language
+        self.voice = voice
+        self.speed = speed
+        self.pitch = pitch
+
+    async def stream(self, text_chunks: Union[Iterable[str], AsyncIterator[str]]) -> AsyncIterator[bytes]:
+        """Yield MP3 bytes per sentence of text_chunks, in order"""
+        text_queue: asyncio.Queue = asyncio.Queue()
+        audio_queue: asyncio.Queue = asyncio.Queue()
+
+        encoder = asyncio.create_task(self._encoder_loop(text_chunks, text_queue))
+        decoder = asyncio.create_task(self._decoder_loop(text_queue, audio_queue))
+
+        try:
+            while (audio := await audio_queue.get()) is not None:
+                yield audio
+        finally:
+            encoder.cancel()
+            decoder.cancel()
+
+    async def _encoder_loop(self, text_chunks, text_queue: asyncio.Queue) -> None:
+        """Queue each complete sentence as soon as its text has arrived"""
+        from services.tts_service import split_complete_sentences
+
+        buffer = ''
+        try:
+            async for chunk in self._iterate(text_chunks):
+                buffer += chunk
+                sentences, buffer = split_complete_sentences(buffer)
+                for sentence in sentences:
+                    await text_queue.put(sentence)
+
+            if buffer.strip():
+                await text_queue.put(buffer.strip())
+        except Exception as e:
+            logger.error(f"Voice pipeline text source failed: {e}")
+        finally:
+            await text_queue.put(None)
+
+    async def _decoder_loop(self, text_queue: asyncio.Queue, audio_queue: asyncio.Queue) -> None:
+        """Synthesize queued sentences in arrival order"""
+        try:
+            while (sentence := await text_queue.get()) is not None:
+                audio = await self.tts_service.synthesize_audio(
+                    sentence, self.language, self.voice, self.speed, self.pitch
+                )
+                await audio_queue.put(audio)
+        except Exception as e:
+            logger.error(f"Voice pipeline synthesis failed: {e}")
+        finally:
+            await audio_queue.put(None)
+
+    @staticmethod
+    async def _iterate(text_chunks) -> AsyncIterator[str]:
+        """
+        Async iteration over either kind of chunk source
+
+        Blocking iterators (like a Gemini stream) are advanced in a worker
+        thread so waiting on the model does not stall the event loop.
+        """
+        if hasattr(text_chunks, '__aiter__'):
+            async for chunk in text_chunks:
+                yield chunk
+            return
+
+        iterator = iter(text_chunks)
+        while (chunk := await asyncio.to_thread(next, iterator, None)) is not None:
+            yield chunk
+
 class VoiceInterfaceAgent(BaseAgent):
     """
     Voice interface agent for speech-to-text and text-to-speech
@@ -32,11 +183,7 @@ class VoiceInterfaceAgent(BaseAgent):
 
         self.google_cloud_key = google_cloud_key
 
-        self.supported_languages = {
-            'en': {'name': 'English', 'code': 'en-IN', 'available_offline': True},
-            'hi': {'name': 'Hindi', 'code': 'hi-IN', 'available_offline': True},
-            'pa': {'name': 'Punjabi', 'code': 'pa-IN', 'available_offline': False}
-        }
+        self.supported_languages = _SUPPORTED_LANGUAGES
 
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent should handle the request"""
@@ -45,10 +192,7 @@ class VoiceInterfaceAgent(BaseAgent):
         if context.get('voice_input') or context.get('requires_voice_output'):
             return 1.0
 
-        query_lower = query.lower()
-        voice_keywords = ['speak', 'listen', 'voice', 'audio', 'say', 'hear', 'read aloud']
-
-        if any(kw in query_lower for kw in voice_keywords):
+        if _VOICE_RE.search(self._lower_query(query, context)):
             return 0.9
 
         return 0.0
@@ -132,6 +276,11 @@ class VoiceInterfaceAgent(BaseAgent):
         """
         Generate audio from text using Google Cloud TTS
         Higher quality than device TTS
+
+        With context['stream'] set and a Cloud key configured, the response
+        carries a 'stream' of MP3 bytes synthesized sentence by sentence.
+        context['text_stream'] (e.g. another agent's streamed answer) is
+        spoken as it is generated, through a StreamingVoicePipeline.
         """
         if language not in self.supported_languages:
             return {
@@ -140,7 +289,56 @@ class VoiceInterfaceAgent(BaseAgent):
                 'supported_languages': list(self.supported_languages.keys())
             }
 
+        from services.tts_service import get_tts_service
+
         lang_info = self.supported_languages[language]
+        settings = {
+            'speed': context.get('speech_rate', 1.0),
+            'pitch': context.get('pitch', 0),
+            'voice_type': context.get('voice_type', 'neutral'),
+            'gender': context.get('gender', 'female')
+        }
+
+        text_stream = context.get('text_stream')
+        if (context.get('stream') or text_stream is not None) and self.google_cloud_key:
+            tts_service = get_tts_service(self.google_cloud_key)
+            if text_stream is not None:
+                pipeline = StreamingVoicePipeline(
+                    tts_service, language, speed=settings['speed'], pitch=settings['pitch']
+                )
+                audio_stream = pipeline.stream(text_stream)
+            else:
+                audio_stream = tts_service.stream(
+                    text, language, speed=settings['speed'], pitch=settings['pitch']
+                )
+            return {
+                'success': True,
+                'operation': 'tts',
+                'mode': 'online',
+                'language': language,
+                'language_code': lang_info['code'],
+                'audio_format': 'mp3',
+                'media_type': 'audio/mpeg',
+                'stream': audio_stream,
+                'settings': settings
+            }
+
+        cached_audio = get_tts_service(self.google_cloud_key).cached_audio(
+            text, language, speed=settings['speed'], pitch=settings['pitch']
+        )
+        if cached_audio is not None:
+            return {
+                'success': True,
+                'operation': 'tts',
+                'mode': 'online',
+                'text': text,
+                'language': language,
+                'language_code': lang_info['code'],
+                'audio_format': 'mp3',
+                'audio_base64': base64.b64encode(cached_audio).decode('ascii'),
+                'cache': 'hit',
+                'settings': settings
+            }
 
         return {
             'success': True,
@@ -152,12 +350,8 @@ class VoiceInterfaceAgent(BaseAgent):
             'audio_format': 'mp3',
             'instruction': 'use_google_tts',
             'api_endpoint': 'https://texttospeech.googleapis.com/v1/text:synthesize',
-            'settings': {
-                'speed': context.get('speech_rate', 1.0),
-                'pitch': context.get('pitch', 0),
-                'voice_type': context.get('voice_type', 'neutral'),
-                'gender': context.get('gender', 'female')
-            },
+            'settings': settings,
+            'cache': 'miss',
             'quality': 'high',
             'note': 'Using Google Cloud TTS for better quality'
         }
@@ -211,10 +405,30 @@ class VoiceInterfaceAgent(BaseAgent):
             'note': 'Using Google Cloud STT for accurate recognition'
         }
 
+    async def speech_to_text_batch(self, audios: List[str], language: str = 'en',
+                                   context: Dict = None) -> List[Dict]:
+        """
+        Transcribe several base64 clips (e.g. spoken menu commands) at once
+
+        With a Cloud key the clips go to Google STT concurrently over one
+        pooled connection; otherwise each gets the device STT instruction.
+        """
+        context = context or {}
+
+        if not self.google_cloud_key:
+            return [self._speech_to_text_offline(audio, language, context) for audio in audios]
+
+        from services.stt_service import get_stt_service
+
+        lang_info = self.supported_languages.get(language, self.supported_languages['en'])
+        return await get_stt_service(self.google_cloud_key).recognize_batch(
+            audios, lang_info['code']
+        )
+
     def get_supported_languages(self) -> Dict:
         """Get list of supported languages with offline availability"""
         return {
-            'languages': self.supported_languages,
+            'languages': dict(self.supported_languages),
             'recommendation': 'Hindi and English work best offline'
         }
 
@@ -262,38 +476,9 @@ class LanguageSupportAgent(BaseAgent):
             default_mode=AgentMode.AUTO
         )
 
-        self.languages = {
-            'en': 'English',
-            'hi': 'Hindi',
-            'pa': 'Punjabi'
-        }
+        self.languages = _LANGUAGES
 
-        self.ui_translations = {
-            'hi': {
-                'home': 'होम',
-                'notes': 'नोट्स',
-                'timetable': 'समय सारणी',
-                'profile': 'प्रोफ़ाइल',
-                'settings': 'सेटिंग्स',
-                'help': 'मदद',
-                'scan': 'स्कैन करें',
-                'share': 'शेयर करें',
-                'save': 'सहेजें',
-                'cancel': 'रद्द करें'
-            },
-            'pa': {
-                'home': 'ਘਰ',
-                'notes': 'ਨੋਟਸ',
-                'timetable': 'ਸਮਾਂ ਸਾਰਣੀ',
-                'profile': 'ਪ੍ਰੋਫਾਈਲ',
-                'settings': 'ਸੈਟਿੰਗਜ਼',
-                'help': 'ਮਦਦ',
-                'scan': 'ਸਕੈਨ',
-                'share': 'ਸਾਂਝਾ',
-                'save': 'ਸੰਭਾਲੋ',
-                'cancel': 'ਰੱਦ'
-            }
-        }
+        self.ui_translations = _UI_TRANSLATIONS
 
     def can_handle(self, query: str, context: Dict = None) -> float:
         """Determine if this agent should handle the request"""
@@ -302,13 +487,7 @@ class LanguageSupportAgent(BaseAgent):
         if context.get('requires_translation'):
             return 1.0
 
-        query_lower = query.lower()
-        translation_keywords = [
-            'translate', 'meaning in', 'hindi me', 'punjabi me',
-            'क्या मतलब', 'किसे कहते हैं', 'ਕੀ ਹੈ'
-        ]
-
-        if any(kw in query_lower for kw in translation_keywords):
+        if _TRANSLATION_RE.search(self._lower_query(query, context)):
             return 0.95
 
         return 0.0
@@ -351,19 +530,19 @@ class LanguageSupportAgent(BaseAgent):
 
     def _translate_ui_element(self, text: str, target_lang: str) -> Dict:
         """Translate UI elements using offline dictionary"""
-        text_lower = text.lower().strip()
+        # Clients mostly send the canonical key already, so try it as-is first
+        translated = _FLAT_UI_TRANSLATIONS.get((target_lang, text))
+        if translated is None:
+            translated = _FLAT_UI_TRANSLATIONS.get((target_lang, text.lower().strip()))
 
-        if target_lang in self.ui_translations:
-            translations = self.ui_translations[target_lang]
-
-            if text_lower in translations:
-                return {
-                    'success': True,
-                    'original': text,
-                    'translated': translations[text_lower],
-                    'language': target_lang,
-                    'mode': 'offline'
-                }
+        if translated is not None:
+            return {
+                'success': True,
+                'original': text,
+                'translated': translated,
+                'language': target_lang,
+                'mode': 'offline'
+            }
 
         return {
             'success': False,
@@ -383,5 +562,5 @@ class LanguageSupportAgent(BaseAgent):
         return {
             'success': True,
             'language': language,
-            'translations': self.ui_translations[language]
+            'translations': dict(self.ui_translations[language])
         }
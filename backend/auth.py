@@ -1,15 +1,17 @@
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, EmailStr, Field, validator
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 import secrets
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
 import os
 
-from database import get_db, User as DBUser, Session as DBSession
+from database import get_db, SessionLocal, User as DBUser, Session as DBSession
 from logging_config import security_logger
 
 logger = logging.getLogger(__name__)
@@ -17,8 +19,27 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 SESSION_EXPIRY_HOURS = int(os.getenv("SESSION_EXPIRY_HOURS", "24"))
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+SESSION_CLEANUP_INTERVAL_S = int(os.getenv("SESSION_CLEANUP_INTERVAL_S", "300"))
+
+_WEAK_PASSWORDS = frozenset({'123456', 'password', '123456789', 'qwerty', 'abc123'})
+# Anything longer cannot be on the list, so it skips the lowercase copy
+_WEAK_PASSWORD_MAX_LEN = max(map(len, _WEAK_PASSWORDS))
+
+# Argon2id work factor; tune per host so a hash stays well under login latency budgets
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+# bcrypt stays listed so existing hashes verify; they are rehashed on next login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    default="argon2",
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM
+)
 
 class User(BaseModel):
     email: EmailStr
@@ -31,8 +52,7 @@ class User(BaseModel):
         if len(v) > 100:
             raise ValueError('Password too long')
 
-        weak_passwords = ['123456', 'password', '123456789', 'qwerty', 'abc123']
-        if v.lower() in weak_passwords:
+        if len(v) <= _WEAK_PASSWORD_MAX_LEN and v.lower() in _WEAK_PASSWORDS:
             raise ValueError('Password is too weak. Use a stronger password')
         return v
 
@@ -42,13 +62,17 @@ class UserResponse(BaseModel):
     token: Optional[str] = None
 
 def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
+    """Hash password using Argon2id"""
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against bcrypt hash"""
+    """Verify password against an Argon2id or legacy bcrypt hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify password, returning a replacement hash when the stored one is outdated"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def generate_token(db: Session, user_id: int, email: str) -> str:
     """Generate a secure session token with database storage"""
     token = secrets.token_urlsafe(32)
@@ -68,28 +92,57 @@ def generate_token(db: Session, user_id: int, email: str) -> str:
 
 def validate_token(db: Session, token: str) -> Optional[dict]:
     """Validate token from database"""
+    # Expired sessions are filtered here and deactivated by cleanup_expired_sessions
     session = db.query(DBSession).filter(
         DBSession.token == token,
-        DBSession.is_active == True
+        DBSession.is_active == True,
+        DBSession.expires_at > datetime.utcnow()
     ).first()
 
     if not session:
         return None
 
-    if datetime.utcnow() > session.expires_at:
-        session.is_active = False
-        db.commit()
-        return None
-
     return {"user_id": session.user_id, "email": session.email}
 
 def cleanup_expired_sessions(db: Session):
     """Clean up expired sessions from database"""
     db.query(DBSession).filter(
+        DBSession.is_active == True,
         DBSession.expires_at < datetime.utcnow()
-    ).update({"is_active": False})
+    ).update({"is_active": False}, synchronize_session=False)
     db.commit()
 
+def _cleanup_expired_sessions_once():
+    """cleanup_expired_sessions in a session of its own"""
+    db = SessionLocal()
+    try:
+        cleanup_expired_sessions(db)
+    finally:
+        db.close()
+
+async def _session_cleanup_loop():
+    """Deactivate expired sessions every SESSION_CLEANUP_INTERVAL_S seconds"""
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL_S)
+        try:
+            await asyncio.to_thread(_cleanup_expired_sessions_once)
+        except Exception as e:
+            logger.error(f"Session cleanup failed: {e}")
+
+_cleanup_task: Optional[asyncio.Task] = None
+
+@router.on_event("startup")
+async def start_session_cleanup():
+    """Sweep expired sessions in the background instead of on every login"""
+    global _cleanup_task
+    _cleanup_task = asyncio.create_task(_session_cleanup_loop())
+
+@router.on_event("shutdown")
+async def stop_session_cleanup():
+    """Stop the background session sweep"""
+    if _cleanup_task is not None:
+        _cleanup_task.cancel()
+
 @router.post("/register", response_model=UserResponse)
 async def register(user: User, request: Request, db: Session = Depends(get_db)):
     """Register a new user account with database storage"""
@@ -106,7 +159,8 @@ async def register(user: User, request: Request, db: Session = Depends(get_db)):
                 detail="User with this email already exists"
             )
 
-        hashed_password = hash_password(user.password)
+        # Hashing takes tens of milliseconds of CPU; keep it off the event loop
+        hashed_password = await asyncio.to_thread(hash_password, user.password)
 
         db_user = DBUser(
             email=user.email,
@@ -158,7 +212,10 @@ async def login(user: User, request: Request, db: Session = Depends(get_db)):
                 detail="Invalid email or password"
             )
 
-        if not verify_password(user.password, db_user.hashed_password):
+        verified, new_hash = await asyncio.to_thread(
+            verify_and_update_password, user.password, db_user.hashed_password
+        )
+        if not verified:
             security_logger.log_event("login_failed_invalid_password", {
                 "ip": request.client.host,
                 "user": user.email
@@ -168,7 +225,8 @@ async def login(user: User, request: Request, db: Session = Depends(get_db)):
                 detail="Invalid email or password"
             )
 
-        cleanup_expired_sessions(db)
+        if new_hash:
+            db_user.hashed_password = new_hash
 
         token = generate_token(db, db_user.id, db_user.email)
 
@@ -200,21 +258,27 @@ async def login(user: User, request: Request, db: Session = Depends(get_db)):
 async def logout(token: str, request: Request, db: Session = Depends(get_db)):
     """End user session by invalidating token"""
     try:
-        session = db.query(DBSession).filter(DBSession.token == token).first()
-
-        if not session:
+        # One UPDATE ... RETURNING instead of loading the row first
+        email = db.execute(
+            update(DBSession)
+            .where(DBSession.token == token)
+            .values(is_active=False)
+            .returning(DBSession.email)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+
+        if email is None:
             raise HTTPException(
                 status_code=401,
                 detail="Invalid session token"
             )
 
-        session.is_active = False
         db.commit()
 
-        logger.info(f"✓ User logged out: {session.email}")
+        logger.info(f"✓ User logged out: {email}")
         security_logger.log_event("logout_success", {
             "ip": request.client.host,
-            "user": session.email
+            "user": email
         })
 
         return {"message": "Logout successful"}
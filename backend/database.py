@@ -1,7 +1,7 @@
 """
 Database models and ORM configuration using SQLAlchemy
 """
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -51,6 +51,10 @@ class Session(Base):
     expires_at = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
 
+    __table_args__ = (
+        Index('ix_sessions_active_expires', 'is_active', 'expires_at'),
+    )
+
 class Note(Base):
     """Note model for storing generated notes"""
     __tablename__ = "notes"
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Request, HTTPException, Depends, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, validator
 from sqlalchemy.orm import Session
 import requests
@@ -778,11 +778,17 @@ async def process_orchestrator_query(
         if query_request.preferred_agent:
             context['preferred_agent'] = query_request.preferred_agent
 
-        response = orchestrator.process_query(
+        response = await orchestrator.process_query_async(
             query=query_request.query,
             context=context
         )
 
+        if response.get('stream') is not None:
+            return StreamingResponse(
+                response['stream'],
+                media_type=response.get('media_type', 'text/plain; charset=utf-8')
+            )
+
         return {
             'success': response.get('success', False),
             'response': response.get('answer') or response.get('response'),
@@ -881,6 +887,12 @@ async def process_agent_query(
             context=query_request.context or {}
         )
 
+        if response.get('stream') is not None:
+            return StreamingResponse(
+                response['stream'],
+                media_type=response.get('media_type', 'text/plain; charset=utf-8')
+            )
+
         return {
             'success': response.get('success', False),
             'response': response.get('answer') or response.get('response') or response.get('message'),
@@ -897,6 +909,24 @@ async def process_agent_query(
         logger.error(f"Agent query failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/accessibility/features")
+@limiter.limit(RateLimits.DEFAULT)
+async def get_accessibility_features(request: Request):
+    """
+    Get available accessibility features
+
+    The payload is static, so the agent's pre-serialized JSON is sent as-is
+    """
+    try:
+        return Response(
+            content=orchestrator.agents['accessibility'].get_features_json(),
+            media_type='application/json'
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to get accessibility features: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/tools")
 @limiter.limit(RateLimits.DEFAULT)
 async def get_all_tools(request: Request):
@@ -1146,6 +1176,38 @@ async def tts_synthesize(
         logger.error(f"TTS error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tts/stream")
+@limiter.limit(RateLimits.DEFAULT)
+async def tts_stream(
+    request: Request,
+    tts_data: TTSRequest
+):
+    """
+    Stream synthesized speech as MP3, one sentence at a time
+
+    Playback can start on the first sentence instead of waiting for the
+    whole text. Takes the same fields as /tts/synthesize; needs Google Cloud TTS.
+    """
+    if not tts_service.online_available:
+        raise HTTPException(status_code=503, detail="Google Cloud TTS is not configured")
+
+    if tts_data.language not in tts_service.supported_languages:
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {tts_data.language}")
+
+    logger.info(f"TTS stream: language={tts_data.language}, "
+               f"text_length={len(tts_data.text)}")
+
+    return StreamingResponse(
+        tts_service.stream(
+            text=tts_data.text,
+            language=tts_data.language,
+            voice=tts_data.voice,
+            speed=tts_data.speed,
+            pitch=tts_data.pitch
+        ),
+        media_type='audio/mpeg'
+    )
+
 @app.get("/tts/voices")
 @limiter.limit(RateLimits.DEFAULT)
 async def tts_get_voices(
@@ -1225,6 +1287,48 @@ async def stt_recognize(
         logger.error(f"STT error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+class STTBatchRequest(BaseModel):
+    """Request model for batch STT"""
+    audios_base64: List[str] = Field(..., description="Base64-encoded audio clips", min_items=1, max_items=20)
+    language: str = Field(default='en-IN', description="Language code (en-IN, hi-IN, etc.)")
+    encoding: str = Field(default='LINEAR16', description="Audio encoding")
+    sample_rate: int = Field(default=16000, description="Sample rate in Hz")
+    use_online: bool = Field(default=True, description="Use Google Cloud STT")
+
+@app.post("/stt/recognize-batch")
+@limiter.limit(RateLimits.DEFAULT)
+async def stt_recognize_batch(
+    request: Request,
+    stt_data: STTBatchRequest
+):
+    """
+    Convert several short clips to text in one request
+
+    Takes the same fields as /stt/recognize, with a list of clips (up to 20)
+    in place of a single one. Results come back in clip order.
+    """
+    try:
+        results = await stt_service.recognize_batch(
+            audios_base64=stt_data.audios_base64,
+            language=stt_data.language,
+            encoding=stt_data.encoding,
+            sample_rate=stt_data.sample_rate,
+            use_online=stt_data.use_online
+        )
+
+        logger.info(f"STT batch recognition: clips={len(results)}, "
+                   f"language={stt_data.language}")
+
+        return {
+            "success": True,
+            "clip_count": len(results),
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error(f"STT batch error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/stt/languages")
 @limiter.limit(RateLimits.DEFAULT)
 async def stt_get_languages(request: Request):
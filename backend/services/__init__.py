@@ -3,7 +3,7 @@ Services Package
 External API integrations for TTS, STT, and YouTube
 """
 
-from services.tts_service import TTSService, TTSProvider, get_tts_service
+from services.tts_service import TTSService, TTSProvider, TTSCache, get_tts_service, get_tts_cache
 from services.stt_service import STTService, STTProvider, get_stt_service
 from services.youtube_service import YouTubeService, get_youtube_service
 from services.fcm_service import FCMService, fcm_service
@@ -11,7 +11,9 @@ from services.fcm_service import FCMService, fcm_service
 __all__ = [
     'TTSService',
     'TTSProvider',
+    'TTSCache',
     'get_tts_service',
+    'get_tts_cache',
     'STTService',
     'STTProvider',
     'get_stt_service',
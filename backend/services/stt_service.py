@@ -4,10 +4,15 @@ Supports both Google Cloud STT (online) and device STT (offline)
 """
 
 import os
+import asyncio
 import base64
+import threading
 from typing import Dict, Any, Optional, List
 from enum import Enum
 
+# Clips of one batch sent to the API at once
+_MAX_CONCURRENT_RECOGNITIONS = 8
+
 class STTProvider(Enum):
     """STT provider types"""
     GOOGLE_CLOUD = "google_cloud"
@@ -29,6 +34,8 @@ class STTService:
         """
         self.api_key = api_key
         self.online_available = api_key is not None
+        self._http = None
+        self._http_lock = threading.Lock()
 
         self.supported_languages = {
             'en-US': 'English (US)',
@@ -86,6 +93,49 @@ class STTService:
 
         return self._recognize_device(language)
 
+    async def recognize_batch(
+        self,
+        audios_base64: List[str],
+        language: str = 'en-IN',
+        encoding: str = 'LINEAR16',
+        sample_rate: int = 16000,
+        use_online: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Convert several clips to text concurrently
+
+        The calls share one pooled HTTP session, so the TLS handshake is
+        paid once per connection instead of once per clip.
+
+        Args:
+            audios_base64: Base64-encoded audio clips
+            language: Language code shared by all clips
+            encoding: Audio encoding
+            sample_rate: Sample rate in Hz
+            use_online: Use Google Cloud STT if available
+
+        Returns:
+            One recognize() result per clip, in input order
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_RECOGNITIONS)
+
+        async def recognize_one(audio_base64: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.recognize, audio_base64, language, encoding, sample_rate, use_online
+                )
+
+        return await asyncio.gather(*(recognize_one(audio) for audio in audios_base64))
+
+    def _session(self):
+        """Shared requests.Session, kept so connections are reused"""
+        with self._http_lock:
+            if self._http is None:
+                import requests
+
+                self._http = requests.Session()
+            return self._http
+
     def _recognize_google_cloud(
         self,
         audio_base64: str,
@@ -107,7 +157,7 @@ class STTService:
         """
         try:
 
-            import requests
+            http = self._session()
 
             url = f"https://speech.googleapis.com/v1/speech:recognize?key={self.api_key}"
 
@@ -134,7 +184,7 @@ class STTService:
                 }
             }
 
-            response = requests.post(url, json=payload, timeout=30)
+            response = http.post(url, json=payload, timeout=30)
 
             if response.status_code == 200:
                 result = response.json()
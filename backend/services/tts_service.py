@@ -4,15 +4,161 @@ Supports both Google Cloud TTS (online) and device TTS (offline)
 """
 
 import os
+import re
+import asyncio
 import base64
-from typing import Dict, Any, Optional, List
+import functools
+import hashlib
+import json
+import logging
+import tempfile
+import unicodedata
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "50"))
+
+# Trim the cache directory every this many writes rather than on each one
+_CURATE_EVERY = 32
+
+# Sentences of one request synthesized at once, to stay clear of API quota spikes
+_MAX_CONCURRENT_SYNTHESES = 8
+
+# Whitespace after sentence-ending punctuation, including the Devanagari danda
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?\u0964])\s+')
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping empty pieces"""
+    return [sentence for sentence in _SENTENCE_BREAK_RE.split(text.strip()) if sentence]
+
+def split_complete_sentences(text: str) -> Tuple[List[str], str]:
+    """Split a growing buffer into its finished sentences and the unfinished rest"""
+    *sentences, rest = _SENTENCE_BREAK_RE.split(text)
+    return [sentence.strip() for sentence in sentences if sentence.strip()], rest
+
 class TTSProvider(Enum):
     """TTS provider types"""
     GOOGLE_CLOUD = "google_cloud"
     DEVICE = "device"
 
+@functools.lru_cache(maxsize=128)
+def _load_audio(path: str) -> bytes:
+    """Read a cached MP3; entries are content-addressed so they never go stale"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+class TTSCache:
+    """
+    Content-addressed store of synthesized MP3 audio
+    - Key: SHA-256 of the normalized text plus every voice setting
+    - Disk: <cache_dir>/<hex>.mp3, trimmed to a size budget by last access
+    - Memory: recently played clips are served without touching disk
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_size_mb: int = TTS_CACHE_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._writes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(text: str, language: str, voice: str, speed: float, pitch: float) -> str:
+        """
+        Hash text and the settings that shape the audio into a cache key
+
+        Text is NFC-normalized and whitespace-collapsed first, so the same
+        phrase typed or decoded differently maps to the same clip. Speed and
+        pitch are coerced to float so 0 and 0.0 share an entry.
+        """
+        normalized = ' '.join(unicodedata.normalize('NFC', text).split())
+        canonical = json.dumps({
+            'text': normalized,
+            'language': language,
+            'voice': voice,
+            'speed': float(speed),
+            'pitch': float(pitch)
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        """Disk location of a cache entry"""
+        return os.path.join(self.cache_dir, f'{key}.mp3')
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio bytes for key, or None on a miss"""
+        path = self.path(key)
+        try:
+            audio = _load_audio(path)
+            os.utime(path)
+        except OSError:
+            return None
+        return audio
+
+    def put(self, key: str, audio: bytes) -> Optional[str]:
+        """
+        Store audio under key and return its path
+
+        A failed write only costs a future cache hit, so it is logged and
+        None is returned rather than failing the synthesis that produced it.
+        """
+        path = self.path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.warning(f"TTS cache store failed: {e}")
+            return None
+
+        self._writes += 1
+        if self._writes % _CURATE_EVERY == 0:
+            self.curate()
+        return path
+
+    def curate(self) -> int:
+        """
+        Delete least recently used clips until the directory fits the budget
+
+        Returns:
+            Number of files removed
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.mp3'):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_size_bytes:
+            return 0
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
 class TTSService:
     """
     Text-to-Speech service with online/offline support
@@ -29,6 +175,7 @@ class TTSService:
         """
         self.api_key = api_key
         self.online_available = api_key is not None
+        self.cache = get_tts_cache()
 
         self.supported_languages = {
             'en': {'name': 'English', 'voices': ['en-US-Standard-A', 'en-US-Standard-B', 'en-IN-Standard-A']},
@@ -103,51 +250,23 @@ class TTSService:
         Returns:
             Dictionary with audio data
         """
-        try:
-
-            import requests
+        if not voice:
+            voice = self.supported_languages[language]['voices'][0]
 
-            if not voice:
-                voice = self.supported_languages[language]['voices'][0]
-
-            url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={self.api_key}"
+        try:
+            audio, cache_hit = self._google_cloud_audio(text, language, voice, speed, pitch)
 
-            payload = {
-                "input": {"text": text},
-                "voice": {
-                    "languageCode": language if '-' not in language else language.split('-')[0] + '-' + language.split('-')[1].upper(),
-                    "name": voice
-                },
-                "audioConfig": {
-                    "audioEncoding": "MP3",
-                    "speakingRate": speed,
-                    "pitch": pitch
-                }
+            return {
+                'success': True,
+                'provider': 'google_cloud',
+                'audio_base64': base64.b64encode(audio).decode('ascii'),
+                'format': 'mp3',
+                'language': language,
+                'voice': voice,
+                'text_length': len(text),
+                'cache': 'hit' if cache_hit else 'miss'
             }
 
-            response = requests.post(url, json=payload, timeout=10)
-
-            if response.status_code == 200:
-                result = response.json()
-                audio_content = result.get('audioContent')
-
-                return {
-                    'success': True,
-                    'provider': 'google_cloud',
-                    'audio_base64': audio_content,
-                    'format': 'mp3',
-                    'language': language,
-                    'voice': voice,
-                    'text_length': len(text)
-                }
-            else:
-                error_msg = response.json().get('error', {}).get('message', 'Unknown error')
-                return {
-                    'success': False,
-                    'error': f'Google Cloud TTS error: {error_msg}',
-                    'fallback_to_device': True
-                }
-
         except ImportError:
             return {
                 'success': False,
@@ -161,6 +280,160 @@ class TTSService:
                 'fallback_to_device': True
             }
 
+    def _google_cloud_audio(
+        self,
+        text: str,
+        language: str,
+        voice: str,
+        speed: float,
+        pitch: float
+    ) -> Tuple[bytes, bool]:
+        """
+        MP3 bytes for text from the cache, or from Google Cloud TTS on a miss
+
+        Returns:
+            (audio, cache_hit)
+
+        Raises:
+            RuntimeError: If the API rejects the request
+        """
+        cache_key = self.cache.key_for(text, language, voice, speed, pitch)
+        cached_audio = self.cache.get(cache_key)
+        if cached_audio is not None:
+            return cached_audio, True
+
+        import requests
+
+        url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={self.api_key}"
+
+        payload = {
+            "input": {"text": text},
+            "voice": {
+                "languageCode": language if '-' not in language else language.split('-')[0] + '-' + language.split('-')[1].upper(),
+                "name": voice
+            },
+            "audioConfig": {
+                "audioEncoding": "MP3",
+                "speakingRate": speed,
+                "pitch": pitch
+            }
+        }
+
+        response = requests.post(url, json=payload, timeout=10)
+
+        if response.status_code != 200:
+            error_msg = response.json().get('error', {}).get('message', 'Unknown error')
+            raise RuntimeError(f'Google Cloud TTS error: {error_msg}')
+
+        audio = base64.b64decode(response.json().get('audioContent', ''))
+        if audio:
+            self.cache.put(cache_key, audio)
+        return audio, False
+
+    def cached_audio(
+        self,
+        text: str,
+        language: str,
+        voice: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: float = 0.0
+    ) -> Optional[bytes]:
+        """MP3 bytes already synthesized for these settings, or None"""
+        if not voice:
+            voice = self.supported_languages[language]['voices'][0]
+        return self.cache.get(self.cache.key_for(text, language, voice, speed, pitch))
+
+    async def stream(
+        self,
+        text: str,
+        language: str = 'en',
+        voice: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: float = 0.0
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield MP3 audio sentence by sentence
+
+        MP3 frames concatenate cleanly, so a client can start playing the
+        first sentence while later ones are still being synthesized. All
+        sentences are requested up front, so the wait after the first one
+        is the slowest sentence rather than the sum of them.
+
+        Args:
+            text: Text to synthesize
+            language: Language code
+            voice: Voice name
+            speed: Speech rate
+            pitch: Voice pitch
+
+        Yields:
+            MP3 bytes for each sentence, in order
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_SYNTHESES)
+        tasks = [
+            asyncio.create_task(self._synthesize_bounded(semaphore, sentence, language, voice, speed, pitch))
+            for sentence in split_sentences(text)
+        ]
+
+        try:
+            for task in tasks:
+                try:
+                    audio = await task
+                except Exception as e:
+                    logger.error(f"TTS stream stopped: {e}")
+                    return
+                yield audio
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize_sentences(
+        self,
+        text: str,
+        language: str = 'en',
+        voice: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: float = 0.0
+    ) -> List[bytes]:
+        """
+        MP3 bytes for each sentence of text, synthesized concurrently
+
+        Returns:
+            Audio per sentence, in sentence order
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_SYNTHESES)
+        return await asyncio.gather(*(
+            self._synthesize_bounded(semaphore, sentence, language, voice, speed, pitch)
+            for sentence in split_sentences(text)
+        ))
+
+    async def _synthesize_bounded(self, semaphore: asyncio.Semaphore, *args) -> bytes:
+        """synthesize_audio with at most _MAX_CONCURRENT_SYNTHESES calls open"""
+        async with semaphore:
+            return await self.synthesize_audio(*args)
+
+    async def synthesize_audio(
+        self,
+        text: str,
+        language: str = 'en',
+        voice: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: float = 0.0
+    ) -> bytes:
+        """
+        MP3 bytes for text via Google Cloud TTS, off the event loop
+
+        Raises:
+            RuntimeError: If the API rejects the request
+        """
+        if not voice:
+            voice = self.supported_languages[language]['voices'][0]
+
+        audio, _ = await asyncio.to_thread(
+            self._google_cloud_audio, text, language, voice, speed, pitch
+        )
+        return audio
+
     def _synthesize_device(
         self,
         text: str,
@@ -237,8 +510,16 @@ class TTSService:
             'supported_languages': len(self.supported_languages)
         }
 
+_tts_cache = None
 _tts_service = None
 
+def get_tts_cache() -> TTSCache:
+    """Get singleton TTS audio cache"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
+
 def get_tts_service(api_key: Optional[str] = None) -> TTSService:
     """Get singleton TTS service instance"""
     global _tts_service
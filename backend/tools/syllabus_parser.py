@@ -24,6 +24,32 @@ class TopicStatus(Enum):
     COMPLETED = "completed"
     NEEDS_REVIEW = "needs_review"
 
+_PROGRESS_UPSERT_SQL = """
+    INSERT INTO user_progress
+    (user_id, subject, topic, status, mastery_level, last_studied,
+     review_due_date, study_sessions, total_time_minutes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+    ON CONFLICT(user_id, subject, topic) DO UPDATE SET
+        status = excluded.status,
+        mastery_level = excluded.mastery_level,
+        last_studied = excluded.last_studied,
+        review_due_date = excluded.review_due_date,
+        study_sessions = study_sessions + 1,
+        total_time_minutes = total_time_minutes + excluded.total_time_minutes
+"""
+
+def _progress_row(user_id: str, subject: str, topic: str, status: TopicStatus,
+                  time_spent_minutes: int, mastery_level: Optional[int], now: datetime) -> tuple:
+    """Parameters for _PROGRESS_UPSERT_SQL, with the spaced-repetition review date"""
+    review_due_date = None
+    if status == TopicStatus.COMPLETED and mastery_level:
+
+        days_until_review = mastery_level * 7
+        review_due_date = now + timedelta(days=days_until_review)
+
+    return (user_id, subject, topic, status.value, mastery_level,
+            now, review_due_date, time_spent_minutes)
+
 class SyllabusParser:
     """
     Custom Tool for syllabus parsing and study path generation
@@ -124,6 +150,7 @@ class SyllabusParser:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_subject_grade ON parsed_syllabus(subject, grade_level)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_paths ON study_paths(user_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_progress ON user_progress(user_id, subject)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_due ON user_progress(user_id, status, review_due_date)")
 
         self.conn.commit()
 
@@ -263,6 +290,15 @@ class SyllabusParser:
                          grade_level: str, topic_ids: List[int],
                          duration_days: int = 90) -> int:
         """Create a personalized study path for a user"""
+        path_id, _ = self._insert_study_path(
+            user_id, path_name, subject, grade_level, topic_ids, duration_days
+        )
+        return path_id
+
+    def _insert_study_path(self, user_id: str, path_name: str, subject: str,
+                           grade_level: str, topic_ids: List[int],
+                           duration_days: int) -> Tuple[int, List[int]]:
+        """Insert a study path and its items; returns (path_id, item ids in sequence order)"""
         cursor = self.conn.cursor()
 
         start_date = datetime.now()
@@ -278,15 +314,17 @@ class SyllabusParser:
 
         path_id = cursor.lastrowid
 
+        item_ids = []
         for order, topic_id in enumerate(topic_ids, start=1):
             cursor.execute("""
                 INSERT INTO study_path_items
                 (path_id, topic_id, sequence_order)
                 VALUES (?, ?, ?)
             """, (path_id, topic_id, order))
+            item_ids.append(cursor.lastrowid)
 
         self.conn.commit()
-        return path_id
+        return path_id, item_ids
 
     def generate_optimal_study_path(self, user_id: str, subject: str,
                                    grade_level: str, available_hours_per_week: float = 10,
@@ -352,7 +390,7 @@ class SyllabusParser:
         total_available_hours = available_hours_per_week * target_weeks
         topic_ids = [t['id'] for t in sorted_topics]
 
-        path_id = self.create_study_path(
+        path_id, item_ids = self._insert_study_path(
             user_id=user_id,
             path_name=f"{subject} - {grade_level} Complete Path",
             subject=subject,
@@ -361,12 +399,35 @@ class SyllabusParser:
             duration_days=target_weeks * 7
         )
 
+        # The new items, shaped like get_study_path_details' rows, so callers
+        # need not read back what was just written
+        items = [
+            {
+                'id': item_id,
+                'path_id': path_id,
+                'topic_id': topic['id'],
+                'sequence_order': order,
+                'status': TopicStatus.NOT_STARTED.value,
+                'progress_percentage': 0,
+                'time_spent_minutes': 0,
+                'started_at': None,
+                'completed_at': None,
+                'notes': None,
+                'topic': topic['topic'],
+                'subtopics': topic['subtopics'],
+                'difficulty': topic['difficulty'],
+                'estimated_hours': topic['estimated_hours']
+            }
+            for order, (item_id, topic) in enumerate(zip(item_ids, sorted_topics), start=1)
+        ]
+
         return {
             'path_id': path_id,
             'total_topics': len(sorted_topics),
             'estimated_hours': total_available_hours,
             'weeks': target_weeks,
-            'topics': sorted_topics
+            'topics': sorted_topics,
+            'items': items
         }
 
     def update_topic_progress(self, user_id: str, subject: str, topic: str,
@@ -375,26 +436,27 @@ class SyllabusParser:
         """Update user's progress on a topic"""
         cursor = self.conn.cursor()
 
-        review_due_date = None
-        if status == TopicStatus.COMPLETED and mastery_level:
+        cursor.execute(_PROGRESS_UPSERT_SQL, _progress_row(
+            user_id, subject, topic, status, time_spent_minutes, mastery_level, datetime.now()
+        ))
 
-            days_until_review = mastery_level * 7
-            review_due_date = datetime.now() + timedelta(days=days_until_review)
+        self.conn.commit()
 
-        cursor.execute("""
-            INSERT INTO user_progress
-            (user_id, subject, topic, status, mastery_level, last_studied,
-             review_due_date, study_sessions, total_time_minutes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
-            ON CONFLICT(user_id, subject, topic) DO UPDATE SET
-                status = excluded.status,
-                mastery_level = excluded.mastery_level,
-                last_studied = excluded.last_studied,
-                review_due_date = excluded.review_due_date,
-                study_sessions = study_sessions + 1,
-                total_time_minutes = total_time_minutes + excluded.total_time_minutes
-        """, (user_id, subject, topic, status.value, mastery_level,
-              datetime.now(), review_due_date, time_spent_minutes))
+    def bulk_update_topic_progress(self, user_id: str, subject: str,
+                                   updates: List[Tuple[str, TopicStatus, int, Optional[int]]]):
+        """
+        Update progress on several topics in one transaction
+
+        Args:
+            updates: (topic, status, time_spent_minutes, mastery_level) per topic
+        """
+        cursor = self.conn.cursor()
+        now = datetime.now()
+
+        cursor.executemany(_PROGRESS_UPSERT_SQL, [
+            _progress_row(user_id, subject, topic, status, time_spent_minutes, mastery_level, now)
+            for topic, status, time_spent_minutes, mastery_level in updates
+        ])
 
         self.conn.commit()
 
@@ -469,6 +531,31 @@ class SyllabusParser:
 
         return path_dict
 
+    def get_study_path_summary(self, path_id: int) -> Dict:
+        """Study path row and progress percentage, without the items list"""
+        cursor = self.conn.cursor()
+
+        cursor.execute("SELECT * FROM study_paths WHERE id = ?", (path_id,))
+        path = cursor.fetchone()
+
+        if not path:
+            return {'error': 'Study path not found'}
+
+        path_dict = dict(path)
+
+        cursor.execute("""
+            SELECT COUNT(*) AS item_count,
+                   COALESCE(SUM(status = 'completed'), 0) AS completed
+            FROM study_path_items
+            WHERE path_id = ?
+        """, (path_id,))
+        counts = cursor.fetchone()
+
+        item_count = counts['item_count']
+        path_dict['progress_percentage'] = (counts['completed'] / item_count * 100) if item_count else 0
+
+        return path_dict
+
     def get_next_topic_to_study(self, user_id: str, path_id: int) -> Optional[Dict]:
         """Get the next topic the user should study in their path"""
         cursor = self.conn.cursor()